@@ -0,0 +1,32 @@
+# Description: This file defines the player's input actions as bit flags, so input can come from the keyboard or from a script.
+import pygame
+
+NONE = 0
+LEFT = 1 << 0
+RIGHT = 1 << 1
+JUMP = 1 << 2
+UP = 1 << 3  # Climb a ladder
+DOWN = 1 << 4  # Drop through a platform
+OPEN = 1 << 5  # Open a chest
+
+# Keyboard key bound to each action
+KEY_BINDINGS = {
+    LEFT: pygame.K_LEFT,
+    RIGHT: pygame.K_RIGHT,
+    JUMP: pygame.K_SPACE,
+    UP: pygame.K_UP,
+    DOWN: pygame.K_DOWN,
+    OPEN: pygame.K_e,
+}
+
+
+def from_keys(keys):
+    """
+    Returns the bitmask of actions whose keys are pressed.
+    :param keys: Pressed-key state, e.g. pygame.key.get_pressed().
+    """
+    actions = NONE
+    for action, key in KEY_BINDINGS.items():
+        if keys[key]:
+            actions |= action
+    return actions
@@ -0,0 +1,102 @@
+# Description: This file contains the shared image cache used by every sprite.
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pygame
+from settings import ASSETS_PATH, ASSET_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class AssetCache:
+    """
+    Loads each image file once and hands the same Surface to every object that asks for it.
+        - Entries are keyed by (path, size), so every scaled copy is only made once.
+        - Surfaces are converted to the display format as soon as a display exists.
+        - The least recently used entry is evicted once the cache is full.
+        - A lock makes the cache safe to fill from a background thread (see preload()).
+    """
+    def __init__(self, max_entries=ASSET_CACHE_SIZE):
+        """
+        Initializes an empty cache.
+        :param max_entries: Maximum number of surfaces (original and scaled) kept in memory.
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (path, size) -> [surface, converted]
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # Guards entries while preload() fills the cache
+
+    def image(self, name, size=None, convert=True):
+        """
+        Returns the image stored at assets/<name>, optionally scaled to size.
+        :param name: Path of the image relative to the assets folder.
+        :param size: (width, height) to scale the image to, or None for the original size.
+        :param convert: Convert the image to the display format if a display exists (only the main thread should).
+        """
+        with self.lock:
+            return self.load(name, size, convert)
+
+    def load(self, name, size, convert):
+        """Does the work of image(). Call with the lock held."""
+        key = (name, tuple(size) if size else None)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if size:
+                surface = pygame.transform.scale(self.load(name, None, convert), key[1])
+            else:
+                surface = pygame.image.load(os.path.join(ASSETS_PATH, name))
+            entry = [surface, False]
+            self.entries[key] = entry
+            self.evict()
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        # Convert once the display exists so blits don't convert pixel formats every frame
+        if convert and not entry[1] and pygame.display.get_surface() is not None:
+            entry[0] = entry[0].convert_alpha()
+            entry[1] = True
+        return entry[0]
+
+    def evict(self):
+        """Drops the least recently used entries until the cache fits in max_entries."""
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def preload(self, images):
+        """
+        Loads and scales images on a background thread and returns the thread.
+        They are converted to the display format the first time the game asks for them.
+        :param images: List of (name, size) pairs, as they are passed to image().
+        """
+        def load_all():
+            start = time.perf_counter()
+            for name, size in images:
+                self.image(name, size, convert=False)
+            logger.info("Preloaded %d images in %.0f ms", len(images), (time.perf_counter() - start) * 1000)
+
+        thread = threading.Thread(target=load_all, name="asset-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """Returns the hit/miss counters and the number of cached surfaces."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+# Shared cache used by the whole game
+assets = AssetCache()
+
+
+def load_image(name, size=None):
+    """
+    Shortcut for assets.image().
+    :param name: Path of the image relative to the assets folder.
+    :param size: (width, height) to scale the image to, or None for the original size.
+    """
+    return assets.image(name, size)
@@ -0,0 +1,218 @@
+# Description: This file packs the sprite images into one texture atlas, so every sprite is drawn from the same
+# surface and each layer can be drawn with a single Surface.blits call.
+# Build the atlas once from the repository root with: python atlas.py (add --scale 0.5 for other render scales)
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import pygame
+from assets import assets
+from display import scaled_size
+from settings import ASSETS_PATH, ATLAS_SPRITES, ATLAS_WIDTH, ATLAS_PADDING, ATLAS_IMAGE, ATLAS_TABLE, RENDER_SCALE
+
+logger = logging.getLogger(__name__)
+
+
+def pack(sizes, width=ATLAS_WIDTH, padding=ATLAS_PADDING):
+    """
+    Places rectangles on shelves: the tallest go first, left to right, and a new shelf starts
+    below the tallest rectangle of the last one when a row is full.
+    Returns the position of each rectangle (in the order given) and the height of the atlas.
+    :param sizes: List of (width, height) of the rectangles.
+    :param width: Width of the atlas.
+    :param padding: Empty pixels kept around every rectangle.
+    """
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i][0] + padding, sizes[i][1] + padding
+        if w > width:
+            raise ValueError(f"A {sizes[i][0]}x{sizes[i][1]} sprite does not fit in an atlas {width} pixels wide")
+        if x + w > width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        positions[i] = (x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+class Atlas:
+    """
+    One surface holding every sprite, and a table of where each sprite is in it.
+        - Sprites are keyed by (name, size), as they are passed to assets.image(), with the size in
+          screen pixels; the atlas holds them scaled to the render target (see display.py).
+        - sprite() returns the (surface, area) pair to blit, so a draw pass can collect
+          (surface, destination, area) items and submit them with one Surface.blits call.
+    """
+    def __init__(self, surface, regions, scale=1):
+        """
+        :param surface: Atlas surface.
+        :param regions: Dict of (name, (width, height)) -> Rect of the sprite in the surface.
+        :param scale: Render scale the sprites were scaled for.
+        """
+        self.surface = surface
+        self.regions = regions
+        self.scale = scale
+        self.converted = False
+
+    @classmethod
+    def build(cls, sprites=ATLAS_SPRITES, width=ATLAS_WIDTH, padding=ATLAS_PADDING, scale=RENDER_SCALE):
+        """
+        Loads, scales and packs the sprites into a new atlas.
+        :param sprites: List of (name, size) pairs to pack.
+        :param width: Width of the atlas (widened if a scaled sprite doesn't fit).
+        :param padding: Empty pixels kept around every sprite.
+        :param scale: Render scale to scale the sprites for.
+        """
+        images = [assets.image(name, scaled_size(size, scale), convert=False) for name, size in sprites]
+        width = max([width] + [image.get_width() + padding for image in images])
+        positions, height = pack([image.get_size() for image in images], width, padding)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        regions = {}
+        for (name, size), image, position in zip(sprites, images, positions):
+            # Max-blending onto the transparent atlas copies the pixels exactly, alpha included
+            regions[(name, tuple(size))] = surface.blit(image, position, special_flags=pygame.BLEND_RGBA_MAX)
+        return cls(surface, regions, scale)
+
+    @classmethod
+    def read(cls, image_path=ATLAS_IMAGE, table_path=ATLAS_TABLE):
+        """
+        Loads an atlas written by write().
+        :param image_path: Atlas image.
+        :param table_path: JSON region table.
+        """
+        with open(table_path) as file:
+            table = json.load(file)
+        regions = {(region["name"], tuple(region["size"])): pygame.Rect(region["rect"]) for region in table["regions"]}
+        return cls(pygame.image.load(image_path), regions, table.get("scale", 1))
+
+    def write(self, image_path=ATLAS_IMAGE, table_path=ATLAS_TABLE):
+        """
+        Writes the atlas image and its JSON region table.
+        :param image_path: File to write the image to (PNG).
+        :param table_path: File to write the region table to.
+        """
+        pygame.image.save(self.surface, image_path)
+        regions = [{"name": name, "size": list(size), "rect": list(rect)} for (name, size), rect in self.regions.items()]
+        with open(table_path, "w") as file:
+            json.dump({"scale": self.scale, "regions": regions}, file, indent=2)
+
+    def convert(self):
+        """Converts the atlas to the display format, once a display exists."""
+        if not self.converted and pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+            self.converted = True
+
+    def sprite(self, name, size):
+        """
+        Returns (surface, area) to blit the sprite from. Sprites that aren't in the atlas are
+        loaded on their own, with area None.
+        :param name: Path of the image relative to the assets folder.
+        :param size: (width, height) the image is drawn at, in screen pixels.
+        """
+        area = self.regions.get((name, tuple(size)))
+        if area is None:
+            return assets.image(name, scaled_size(size, self.scale)), None
+        return self.surface, area
+
+    def image(self, name, size):
+        """
+        Returns the sprite as a surface of its own (sharing the atlas's pixels), for code that
+        composites it into another surface.
+        :param name: Path of the image relative to the assets folder.
+        :param size: (width, height) the image is drawn at, in screen pixels.
+        """
+        surface, area = self.sprite(name, size)
+        return surface if area is None else surface.subsurface(area)
+
+    def stats(self):
+        """Returns the size of the atlas and the number of sprites in it."""
+        return {"size": self.surface.get_size(), "sprites": len(self.regions)}
+
+
+def atlas_paths(scale=RENDER_SCALE):
+    """
+    Returns the (image, region table) files of the built atlas for a render scale,
+    e.g. atlas.png for scale 1 and atlas@0.5x.png for scale 0.5.
+    :param scale: Render scale.
+    """
+    if scale == 1:
+        return ATLAS_IMAGE, ATLAS_TABLE
+    return tuple(f"{root}@{scale:g}x{extension}"
+                 for root, extension in map(os.path.splitext, (ATLAS_IMAGE, ATLAS_TABLE)))
+
+
+def is_current(sprites=ATLAS_SPRITES, scale=RENDER_SCALE):
+    """
+    Whether a built atlas exists for the render scale, holds exactly the given sprites and is newer than their images.
+    :param sprites: List of (name, size) pairs the atlas should hold.
+    :param scale: Render scale.
+    """
+    image_path, table_path = atlas_paths(scale)
+    try:
+        built = min(os.path.getmtime(image_path), os.path.getmtime(table_path))
+        with open(table_path) as file:
+            table = json.load(file)
+        packed = {(region["name"], tuple(region["size"])) for region in table["regions"]}
+    except (OSError, ValueError, KeyError):
+        return False
+    if table.get("scale", 1) != scale or packed != {(name, tuple(size)) for name, size in sprites}:
+        return False
+    return all(os.path.getmtime(os.path.join(ASSETS_PATH, name)) <= built for name, _ in sprites)
+
+
+_atlases = {}  # Render scale -> Atlas
+_lock = threading.Lock()
+
+
+def sprite_atlas(convert=True, scale=RENDER_SCALE):
+    """
+    Returns the shared atlas for a render scale, loading the built one, or packing it in memory if it is
+    missing or out of date.
+    :param convert: Convert the atlas to the display format if a display exists (only the main thread should).
+    :param scale: Render scale.
+    """
+    with _lock:
+        atlas = _atlases.get(scale)
+        if atlas is None:
+            start = time.perf_counter()
+            if is_current(scale=scale):
+                atlas = Atlas.read(*atlas_paths(scale))
+            else:
+                logger.info("No up-to-date atlas for scale %g in %s, packing the sprites in memory "
+                            "(run atlas.py to build it)", scale, ASSETS_PATH)
+                atlas = Atlas.build(scale=scale)
+            _atlases[scale] = atlas
+            logger.debug("Atlas ready in %.0f ms", (time.perf_counter() - start) * 1000)
+        if convert:
+            atlas.convert()
+        return atlas
+
+
+def preload():
+    """Loads the atlas on a background thread and returns the thread. It is converted on first use."""
+    thread = threading.Thread(target=sprite_atlas, args=(False,), name="atlas-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the sprites into texture atlases.")
+    parser.add_argument("--scale", type=float, action="append",
+                        help="render scale to build an atlas for (repeatable, default 1)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for scale in args.scale or [1]:
+        atlas = Atlas.build(scale=scale)
+        image_path, table_path = atlas_paths(scale)
+        atlas.write(image_path, table_path)
+        width, height = atlas.surface.get_size()
+        print(f"Packed {len(atlas.regions)} sprites into a {width}x{height} atlas: {image_path}, {table_path}")
+
+
+if __name__ == "__main__":
+    main()
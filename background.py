@@ -1,50 +1,120 @@
 # Description: This file manages the art for the background (dirt, clouds, etc.)
 import pygame
 import random
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, BACKGROUND, GROUND_LEVEL
+from atlas import sprite_atlas
+from display import scaled, scaled_size
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, BACKGROUND, GROUND_LEVEL, RENDER_SCALE
 
 class BackgroundManager:
-    def __init__(self):
+    """
+    The background is drawn from two cached layers:
+        - The static layer holds the sky colour and the dirt strip, composited once.
+        - The cloud layer is a strip as wide as the screen plus one cloud. It scrolls by
+          changing the offset it is blitted at, wrapping around at the end of the strip.
+        - Cloud positions and scrolling are in screen pixels; the layers are drawn at the render
+          target's scale (see display.py), and so are the areas draw methods return.
+    """
+    def __init__(self, rng=random, scale=RENDER_SCALE):
+        """
+        Loads the background images and pre-draws the cached layers.
+        :param rng: Random number generator for cloud heights (e.g. a seeded random.Random, so replays match).
+        :param scale: Size of the render target relative to the screen size.
+        """
+        self.rng = rng
+        self.scale = scale
+
         # Load and scale assets
         # Dirt
-        self.dirt_img = pygame.image.load("assets/images/dirt.png")
-        self.dirt_img = pygame.transform.scale(self.dirt_img, (200, 100))
+        atlas = sprite_atlas(scale=scale)
+        self.dirt_img = atlas.image("images/dirt.png", (200, 100))
         # Dimensions
         self.DIRT_WIDTH = 200
         self.DIRT_HEIGHT = 100
 
         # Cloud
-        self.cloud_img = pygame.image.load("assets/images/cloud.png")
-        self.cloud_img = pygame.transform.scale(self.cloud_img, (200, 100))
-        # Settings
+        self.cloud_img = atlas.image("images/cloud.png", (200, 100))
+        self.CLOUD_WIDTH = 200
+        self.CLOUD_HEIGHT = 100
+        # Settings (cloud x positions are measured along the cloud strip)
         self.clouds = [
-            [SCREEN_WIDTH, 100],
-            [SCREEN_WIDTH + 200, 200],
-            [SCREEN_WIDTH + 400, 150],
+            [SCREEN_WIDTH + self.CLOUD_WIDTH, 100],
+            [SCREEN_WIDTH + self.CLOUD_WIDTH + 200, 200],
+            [SCREEN_WIDTH + self.CLOUD_WIDTH + 400, 150],
         ]
         self.cloud_speed = 1  # Control cloud movement speed
+        self.cloud_offset = 0  # How far the cloud strip has scrolled
+        self.strip_width = SCREEN_WIDTH + self.CLOUD_WIDTH
+
+        # Render target area the clouds can cover (clouds are 50-200 pixels from the top)
+        width, height = scaled_size((SCREEN_WIDTH, SCREEN_HEIGHT), scale)
+        self.cloud_area = pygame.Rect(0, scaled(50, scale), width, scaled(200 + self.CLOUD_HEIGHT - 50, scale))
+
+        # Pre-composite the static layer: sky colour + dirt
+        self.static_layer = pygame.Surface((width, height))
+        self.static_layer.fill(BACKGROUND)
+        self.draw_dirt(self.static_layer)
+        if pygame.display.get_surface() is not None:
+            self.static_layer = self.static_layer.convert()
+
+        self.cloud_layer = pygame.Surface((scaled(self.strip_width, scale), self.cloud_area.height), pygame.SRCALPHA)
+        self.render_clouds()
+
+    def render_clouds(self):
+        """Redraw the cloud strip from the current cloud positions."""
+        self.cloud_layer.fill((0, 0, 0, 0))
+        strip_width = self.cloud_layer.get_width()
+        for x, y in self.clouds:
+            position = (scaled(x % self.strip_width, self.scale), scaled(y, self.scale) - self.cloud_area.top)
+            # Clouds are drawn twice so the one crossing the end of the strip wraps around
+            for wrap in (0, strip_width):
+                self.cloud_layer.blit(self.cloud_img, (position[0] - wrap, position[1]))
 
-    def update_clouds(self):
-        """Update cloud positions, recycling them when off-screen."""
-        for cloud in self.clouds:
-            cloud[0] -= self.cloud_speed
-            if cloud[0] < -self.cloud_img.get_width():  # Recycle off-screen clouds
-                cloud[0] = SCREEN_WIDTH
-                cloud[1] = random.randint(50, 200)  # Randomize height for variety
+    def update_clouds(self, ticks=1):
+        """
+        Scroll the cloud strip, recycling clouds that went off-screen at a new height.
+        :param ticks: Number of ticks to scroll for (the strip is redrawn once at the end).
+        """
+        recycled = False
+        for _ in range(ticks):
+            self.cloud_offset = (self.cloud_offset + self.cloud_speed) % self.strip_width
+            for cloud in self.clouds:
+                # A cloud left the screen once the strip scrolled past its right edge
+                if (cloud[0] - self.cloud_offset) % self.strip_width < self.cloud_speed:
+                    cloud[1] = self.rng.randint(50, 200)  # Randomize height for variety
+                    recycled = True
+        if recycled:
+            self.render_clouds()
 
     def draw(self, screen):
-        """Draw the background elements: solid color, dirt, and clouds."""
-        # Fill background color
-        screen.fill(BACKGROUND)
+        """
+        Draw the whole background: static layer and clouds.
+        Returns the list of render target areas that changed.
+        """
+        screen.blit(self.static_layer, (0, 0))
+        self.draw_clouds(screen)
+        return [screen.get_rect()]
 
-        # Draw clouds
-        for cloud in self.clouds:
-            screen.blit(self.cloud_img, cloud)
+    def draw_clouds(self, screen):
+        """
+        Redraw the cloud area: the static layer underneath, then the scrolled cloud strip.
+        Returns the render target area that changed.
+        """
+        screen.blit(self.static_layer, self.cloud_area, self.cloud_area)
+        # The strip starts one cloud width left of the screen
+        x = scaled(-self.CLOUD_WIDTH - self.cloud_offset, self.scale)
+        screen.blit(self.cloud_layer, (x, self.cloud_area.top))
+        screen.blit(self.cloud_layer, (x + self.cloud_layer.get_width(), self.cloud_area.top))
+        return self.cloud_area
 
-        # Draw dirt
-        self.draw_dirt(screen)
+    def restore(self, screen, rect):
+        """
+        Erase a sprite by copying the static layer back over the given screen area.
+        :param screen: Pygame screen surface.
+        :param rect: Render target area to restore.
+        """
+        screen.blit(self.static_layer, rect, rect)
 
-    def draw_dirt(self, screen):
-        """Draw the dirt texture repeatedly across the bottom of the screen."""
+    def draw_dirt(self, surface):
+        """Draw the dirt texture repeatedly across the bottom of the surface."""
         for x in range(0, SCREEN_WIDTH, self.DIRT_WIDTH):
-            screen.blit(self.dirt_img, (x, SCREEN_HEIGHT - self.DIRT_HEIGHT))
\ No newline at end of file
+            surface.blit(self.dirt_img, scaled_size((x, SCREEN_HEIGHT - self.DIRT_HEIGHT), self.scale))
@@ -0,0 +1,49 @@
+# Description: Measures per-frame collision cost as the number of platforms grows.
+# Run from the repository root with: python -m benchmarks.collisions
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # No window needed
+
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_LEVEL
+from actions import NONE
+from player import first_landing
+from world import World
+
+PLATFORM_COUNTS = [20, 100, 1000, 10000, 100000]
+FRAMES = 1000
+
+
+def time_per_frame(function, frames=FRAMES):
+    """Returns the average time of one call to function in microseconds."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        function()
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    print(f"{'platforms':>10} {'update (us)':>12} {'indexed (us)':>13} {'linear (us)':>12}")
+    for num_platforms in PLATFORM_COUNTS:
+        world = World(num_platforms=num_platforms)
+        player, platform_manager = world.player, world.platform_manager
+        player.rect.centerx = platform_manager.level_width // 2  # Away from the first platforms
+        player.vel_y = 1  # Falling, so every platform check runs fully
+
+        managers = (world.platform_manager, world.ladder_manager, world.chest_manager, world.enemy_manager)
+        update = time_per_frame(lambda: player.update(NONE, *managers))
+        rect = player.rect
+        indexed = time_per_frame(lambda: first_landing(platform_manager.nearby(rect), rect.centerx, rect.bottom, GROUND_LEVEL))
+        linear = time_per_frame(lambda: first_landing(platform_manager.platforms, rect.centerx, rect.bottom, GROUND_LEVEL),
+                                frames=20)
+        print(f"{num_platforms:>10} {update:>12.1f} {indexed:>13.1f} {linear:>12.1f}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# Description: Times the update, collision and draw paths on synthetic worlds of increasing size, writes the
+# results as JSON and compares them with an earlier run to catch regressions.
+# Run from the repository root with: python -m benchmarks.suite --out results.json --compare baseline.json
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # No window needed
+
+import numpy as np
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_LEVEL
+from actions import NONE
+from background import BackgroundManager
+from levels import generate_level
+from navigation import NavGraph, GROUND
+from objects.enemy import EnemyStore
+from player import first_landing
+from world import World
+
+PLATFORM_COUNTS = [10, 100, 1000, 10000, 100000]
+ENEMY_COUNTS = [1, 10, 100, 1000, 10000]
+NAVIGATION_COUNTS = [10, 100, 1000, 10000]
+MIN_BATCH_TIME = 0.02  # Each timed batch runs at least this many seconds
+REPEATS = 5  # Timed batches per benchmark; the median is reported
+
+# Names yielded by each group of benchmarks, so --filter can skip a group before its world is built
+PLATFORM_BENCHMARKS = ("player.update", "player.first_landing", "platform_manager.draw", "ladder_manager.draw",
+                       "chest_manager.draw", "world.step")
+ENEMY_BENCHMARKS = ("enemy_manager.update", "enemy_manager.colliding", "enemy_manager.draw")
+NAVIGATION_BENCHMARKS = ("navgraph.build", "navgraph.path", "navgraph.can_reach_chest")
+BACKGROUND_BENCHMARKS = ("background.draw", "background.draw_clouds", "background.update_clouds")
+
+
+def measure(function, repeats=REPEATS, min_batch_time=MIN_BATCH_TIME):
+    """
+    Times function and returns the median and fastest time of one call in microseconds,
+    and the number of calls per batch.
+    :param function: Function to time, called without arguments.
+    :param repeats: Number of timed batches.
+    :param min_batch_time: Shortest time one batch should take, in seconds.
+    """
+    # Double the batch size until a batch takes long enough to time reliably
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        if time.perf_counter() - start >= min_batch_time or calls >= 1 << 20:
+            break
+        calls *= 2
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        times.append((time.perf_counter() - start) / calls * 1e6)
+    return {"median_us": statistics.median(times), "min_us": min(times), "calls": calls}
+
+
+def platform_world(num_platforms):
+    """
+    Builds a world with num_platforms platforms and puts the player and camera in the middle of it,
+    falling, so every platform check runs fully.
+    """
+    world = World(seed=0, num_platforms=num_platforms)
+    world.player.rect.centerx = world.platform_manager.level_width // 2
+    world.player.vel_y = 1
+    world.camera.follow(world.player.rect)
+    world.camera.begin_frame()
+    return world
+
+
+def enemy_world(num_enemies):
+    """
+    Builds a small world with num_enemies enemies spread over the screen. They don't move, so every
+    timed call sees the same enemies.
+    """
+    world = World(seed=0, num_platforms=100)
+    store = world.enemy_manager.store = EnemyStore(capacity=num_enemies)
+    rng = np.random.default_rng(0)
+    for x in rng.integers(world.camera.x, world.camera.x + SCREEN_WIDTH, num_enemies):
+        store.add(int(x), GROUND_LEVEL - 50, 0)
+    world.camera.begin_frame()
+    return world
+
+
+def platform_benchmarks(num_platforms, surface):
+    """Yields (name, function) for PLATFORM_BENCHMARKS, which scale with the number of platforms."""
+    world = platform_world(num_platforms)
+    player, camera = world.player, world.camera
+    managers = (world.platform_manager, world.ladder_manager, world.chest_manager, world.enemy_manager)
+
+    yield "player.update", lambda: player.update(NONE, *managers)
+    yield "player.first_landing", lambda: first_landing(world.platform_manager.nearby(player.rect),
+                                                        player.rect.centerx, player.rect.bottom, GROUND_LEVEL)
+    yield "platform_manager.draw", lambda: world.platform_manager.draw(surface, camera)
+    yield "ladder_manager.draw", lambda: world.ladder_manager.draw(surface, camera)
+    yield "chest_manager.draw", lambda: world.chest_manager.draw(surface, camera)
+    yield "world.step", lambda: world.step(NONE)
+
+
+def enemy_benchmarks(num_enemies, surface):
+    """Yields (name, function) for ENEMY_BENCHMARKS, which scale with the number of enemies."""
+    world = enemy_world(num_enemies)
+    enemy_manager, camera, player = world.enemy_manager, world.camera, world.player
+
+    yield "enemy_manager.update", lambda: enemy_manager.update(0, camera, GROUND_LEVEL)
+    yield "enemy_manager.colliding", lambda: enemy_manager.colliding(player.rect)
+    yield "enemy_manager.draw", lambda: enemy_manager.draw(surface, camera)
+
+
+def navigation_benchmarks(num_platforms):
+    """Yields (name, function) for NAVIGATION_BENCHMARKS: building a level's NavGraph and querying it."""
+    level = generate_level(0, num_platforms)
+    graph = level.nav_graph()
+    goal = max(graph.reachable, key=lambda i: graph.moves(GROUND, i), default=GROUND)  # Longest path from the ground
+    chest = level.chests[0]
+
+    yield "navgraph.build", lambda: NavGraph(level.platforms, level.ladders, GROUND_LEVEL)
+    yield "navgraph.path", lambda: graph.path(GROUND, goal)
+    yield "navgraph.can_reach_chest", lambda: graph.can_reach_chest(chest)
+
+
+def background_benchmarks(surface):
+    """Yields (name, function) for BACKGROUND_BENCHMARKS."""
+    background_manager = BackgroundManager()
+    yield "background.draw", lambda: background_manager.draw(surface)
+    yield "background.draw_clouds", lambda: background_manager.draw_clouds(surface)
+    yield "background.update_clouds", background_manager.update_clouds
+
+
+def run(name_filter=""):
+    """
+    Runs every benchmark whose name contains name_filter and returns the results,
+    keyed by benchmark name and size (e.g. "player.update[platforms=1000]").
+    :param name_filter: Only run benchmarks whose key contains this text.
+    """
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))  # Offscreen target, so only drawing is timed
+    # (size, benchmark names, function building the group's world and yielding its benchmarks)
+    groups = [(f"platforms={n}", PLATFORM_BENCHMARKS, functools.partial(platform_benchmarks, n, surface))
+              for n in PLATFORM_COUNTS]
+    groups += [(f"enemies={n}", ENEMY_BENCHMARKS, functools.partial(enemy_benchmarks, n, surface))
+               for n in ENEMY_COUNTS]
+    groups += [(f"platforms={n}", NAVIGATION_BENCHMARKS, functools.partial(navigation_benchmarks, n))
+               for n in NAVIGATION_COUNTS]
+    groups.append(("", BACKGROUND_BENCHMARKS, functools.partial(background_benchmarks, surface)))
+
+    results = {}
+    for size, names, benchmarks in groups:
+        keys = {name: f"{name}[{size}]" if size else name for name in names}
+        if not any(name_filter in key for key in keys.values()):
+            continue  # Skip building the world for a group with nothing to run
+        for name, function in benchmarks():
+            key = keys[name]
+            if name_filter not in key:
+                continue
+            results[key] = measure(function)
+            print(f"{key:<52} {results[key]['median_us']:>12.2f} us", flush=True)
+    return results
+
+
+def environment():
+    """Describes where the benchmarks ran, so results from different machines aren't mixed up."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline run and returns the keys of the benchmarks that got slower
+    by more than tolerance.
+    :param results: Results of this run.
+    :param baseline: Results of the earlier run.
+    :param tolerance: Allowed slowdown, e.g. 0.25 for 25%.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<52} {'baseline':>12} {'now':>12} {'change':>8}")
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        before, now = baseline[key]["median_us"], result["median_us"]
+        change = now / before - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:<52} {before:>12.2f} {now:>12.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the update, collision and draw paths.")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="slowdown compared with --compare that counts as a regression (default 0.25)")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = run(args.filter)
+    pygame.quit()
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Description: This file contains the camera that decides which part of the level is on screen.
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, RENDER_SCALE
+
+
+class Camera:
+    """
+    Objects keep their world positions; the camera offset is applied when drawing.
+        - The camera scrolls once the followed rect passes the middle of the screen (or the
+          first quarter when walking back left).
+        - The camera never scrolls past the start or the end of the level.
+        - Managers only draw the objects returned by visible(), which counts drawn and culled objects;
+          World.draw records them in the profiler's frame record as "objects drawn" and "objects culled".
+        - apply() also scales to the render target (see display.py); everything else is in screen pixels.
+    """
+    def __init__(self, level_width, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, scale=RENDER_SCALE):
+        """
+        Initializes the camera at the start of the level.
+        :param level_width: Width of the level in pixels.
+        :param width: Width of the visible area.
+        :param height: Height of the visible area.
+        :param scale: Size of the render target relative to the screen size.
+        """
+        self.scale = scale
+        self.x = 0  # World x-coordinate of the left edge of the screen
+        self.prev_x = 0  # Value of x before the latest tick
+        self.draw_x = 0  # Interpolated x used while drawing the current frame
+        self.width = width
+        self.height = height
+        self.level_width = max(level_width, width)
+        self.drawn = 0  # Objects drawn this frame
+        self.culled = 0  # Objects skipped this frame because they are off-screen
+
+    @property
+    def view(self):
+        """The visible area of the level in world coordinates."""
+        return pygame.Rect(self.x, 0, self.width, self.height)
+
+    def apply(self, rect):
+        """
+        Converts a world-space rect to render target space.
+        :param rect: pygame.Rect in world coordinates.
+        """
+        if self.scale == 1:
+            return rect.move(-self.draw_x, 0)
+        scale = self.scale
+        return pygame.Rect(round((rect.x - self.draw_x) * scale), round(rect.y * scale),
+                           round(rect.width * scale), round(rect.height * scale))
+
+    def begin_frame(self, alpha=1.0):
+        """
+        Resets the drawn/culled counters and sets the interpolated offset before a new frame is drawn.
+        :param alpha: How far (0-1) to interpolate from the previous tick to the latest one.
+        """
+        self.drawn = 0
+        self.culled = 0
+        self.draw_x = round(self.prev_x + (self.x - self.prev_x) * alpha)
+
+    def visible(self, index, sprite_width=0):
+        """
+        Returns the objects of a SpatialIndex that intersect the visible area.
+        Sprites are drawn from their rect's top-left corner, so a sprite wider than its rect can still
+        be on screen after the rect has left it on the left: the area is widened by the sprite width.
+        :param index: SpatialIndex holding the objects to draw.
+        :param sprite_width: Width the objects are drawn at, if wider than their rects.
+        """
+        items = index.query(pygame.Rect(self.draw_x - sprite_width, 0, self.width + sprite_width, self.height))
+        self.drawn += len(items)
+        self.culled += len(index) - len(items)
+        return items
+
+    def follow(self, rect):
+        """
+        Scrolls so the rect stays between the first quarter and the middle of the screen.
+        :param rect: pygame.Rect to follow (usually the player's) in world coordinates.
+        """
+        self.prev_x = self.x
+        screen_x = rect.x - self.x
+        if screen_x > self.width // 2:
+            self.x += screen_x - self.width // 2
+        elif screen_x < self.width // 4:
+            self.x -= self.width // 4 - screen_x
+        self.x = max(0, min(self.x, self.level_width - self.width))
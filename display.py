@@ -0,0 +1,132 @@
+# Description: This file contains the render target the game draws into and the helpers that convert sizes and
+# positions from screen pixels (SCREEN_WIDTH x SCREEN_HEIGHT) to render target pixels.
+import logging
+
+import pygame
+from settings import (SCREEN_WIDTH, SCREEN_HEIGHT, RENDER_SCALE, WINDOW_SIZE, SMOOTH_SCALING, HARDWARE_SCALING,
+                      BACKGROUND)
+
+logger = logging.getLogger(__name__)
+
+
+def scaled(length, scale=RENDER_SCALE):
+    """
+    Converts a length in screen pixels to render target pixels.
+    :param length: Length in screen pixels.
+    :param scale: Render scale.
+    """
+    return length if scale == 1 else round(length * scale)
+
+
+def scaled_size(size, scale=RENDER_SCALE):
+    """
+    Converts a (width, height) in screen pixels to render target pixels.
+    :param size: (width, height) in screen pixels.
+    :param scale: Render scale.
+    """
+    return tuple(size) if scale == 1 else (round(size[0] * scale), round(size[1] * scale))
+
+
+class RenderTarget:
+    """
+    The surface everything is drawn into, RENDER_SCALE times the screen size, and how it gets to the window.
+        - Without WINDOW_SIZE the window is the render target, and present() only sends the changed areas.
+        - With WINDOW_SIZE the game draws into an offscreen surface of fixed size, which present() upscales
+          once per frame into the (resizable) window, keeping the aspect ratio. The per-frame drawing cost
+          only depends on RENDER_SCALE, whatever the window size.
+        - With HARDWARE_SCALING SDL does that upscaling on the GPU instead.
+    """
+    def __init__(self, scale=RENDER_SCALE, window_size=WINDOW_SIZE, smooth=SMOOTH_SCALING, hardware=HARDWARE_SCALING):
+        """
+        :param scale: Size of the render target relative to the screen size.
+        :param window_size: (width, height) of the window, or None for a window the size of the render target.
+        :param smooth: Filter when upscaling in software.
+        :param hardware: Let SDL upscale on the GPU.
+        """
+        self.size = scaled_size((SCREEN_WIDTH, SCREEN_HEIGHT), scale)
+        self.window_size = window_size
+        self.smooth = smooth
+        self.hardware = hardware
+        self.window = None
+        self.surface = None
+        self.area = None  # Part of the window the render target is shown in
+
+    @property
+    def direct(self):
+        """Whether the game draws straight into the window."""
+        return self.surface is self.window
+
+    def open(self, caption):
+        """
+        Opens the window and returns the surface to draw into.
+        :param caption: Window title.
+        """
+        if self.hardware:
+            try:
+                self.window = pygame.display.set_mode(self.size, pygame.SCALED | pygame.RESIZABLE)
+            except pygame.error as error:
+                logger.warning("Hardware scaling unavailable (%s), scaling in software", error)
+                self.hardware = False
+        if not self.hardware:
+            if self.window_size is None or tuple(self.window_size) == self.size:
+                self.window = pygame.display.set_mode(self.size)
+            else:
+                self.window = pygame.display.set_mode(self.window_size, pygame.RESIZABLE)
+        pygame.display.set_caption(caption)
+        self.surface = self.window if self.hardware or self.window.get_size() == self.size else (
+            pygame.Surface(self.size).convert())
+        self.resized()
+        return self.surface
+
+    def resized(self):
+        """Fits the render target into the window again after it was resized."""
+        window_width, window_height = self.window.get_size()
+        width, height = self.size
+        zoom = min(window_width / width, window_height / height)
+        self.area = pygame.Rect(0, 0, round(width * zoom), round(height * zoom))
+        self.area.center = (window_width // 2, window_height // 2)
+        if not self.direct:
+            self.window.fill(BACKGROUND)  # Borders around the render target
+
+    def handle(self, event):
+        """
+        Handles window events. Returns True if the window was resized, so the whole frame has to be drawn again.
+        :param event: Pygame event.
+        """
+        if event.type == pygame.VIDEORESIZE and not self.direct:
+            self.resized()
+            return True
+        return False
+
+    def to_target(self, pos):
+        """
+        Converts a window position (e.g. of a mouse click) to render target pixels.
+        :param pos: (x, y) in the window.
+        """
+        if self.direct:
+            return pos  # Already scaled back by SDL with hardware scaling
+        x, y = pos
+        return ((x - self.area.x) * self.size[0] // self.area.width,
+                (y - self.area.y) * self.size[1] // self.area.height)
+
+    def present(self, rects=None):
+        """
+        Shows the frame drawn into the render target.
+        :param rects: Areas of the render target that changed, or None if all of it did.
+        """
+        if self.direct:
+            if rects is None or self.hardware:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
+        window_area = self.window.subsurface(self.area)
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, self.area.size, window_area)
+        else:
+            pygame.transform.scale(self.surface, self.area.size, window_area)
+        pygame.display.update(self.area)
+
+
+# Shared render target, opened by the game (or the replay viewer)
+target = RenderTarget()
@@ -0,0 +1,330 @@
+# Description: This file wraps the headless world as an environment for automated agents, and steps many of them
+# at once across worker processes that write their observations straight into shared memory.
+# Measure the throughput from the repository root with: python env.py --envs 256 --workers 8
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing.sharedctypes import RawArray
+
+import numpy as np
+import pygame
+from settings import (SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_LEVEL, GAME_TICKS, ENV_VIEW, ENV_PLATFORMS, ENV_LADDERS,
+                      ENV_CHESTS, ENV_ENEMIES)
+from world import World
+
+# Observation layout: player features, then OBJECT_FEATURES values for each of the nearest objects of every kind.
+# Positions are relative to the player's feet, in screen widths; velocities are in pixels per tick.
+PLAYER_FEATURES = 8  # time left, progress through the level, height, vel_x, vel_y, on platform, on ladder, jumping
+OBJECT_FEATURES = 4  # present, then three values per kind (see observe())
+OBJECT_SLOTS = ENV_PLATFORMS + ENV_LADDERS + ENV_CHESTS + ENV_ENEMIES
+OBS_SIZE = PLAYER_FEATURES + OBJECT_FEATURES * OBJECT_SLOTS
+
+
+def nearest(objects, x, count):
+    """
+    Returns the count objects whose rect's centre is horizontally closest to x.
+    :param objects: Objects with a pygame.Rect stored in their rect attribute.
+    :param x: X-coordinate to measure from.
+    :param count: Number of objects to return (fewer if there aren't enough).
+    """
+    return sorted(objects, key=lambda obj: abs(obj.rect.centerx - x))[:count]
+
+
+def observe(world, ticks, out):
+    """
+    Writes the observation of a world into out.
+        - Platforms: left edge, right edge and top.
+        - Ladders: centre, top and bottom.
+        - Chests: centre x, centre y and whether the chest is open.
+        - Enemies: left edge, top and speed.
+    Unused object slots are all zeros.
+    :param world: World to observe.
+    :param ticks: Number of ticks the game lasts.
+    :param out: Float array of OBS_SIZE values to write to.
+    """
+    player = world.player
+    rect = player.rect
+    x, y = rect.centerx, rect.bottom
+    view = pygame.Rect(x - ENV_VIEW, 0, 2 * ENV_VIEW, SCREEN_HEIGHT)
+
+    w = SCREEN_WIDTH
+    values = [
+        1 - world.tick / ticks,
+        x / max(world.platform_manager.level_width, SCREEN_WIDTH),
+        (GROUND_LEVEL - y) / w,
+        player.vel_x,
+        player.vel_y,
+        player.on_platform,
+        getattr(player, "on_ladder", False),  # Only set once the player has updated
+        player.is_jumping,
+    ]
+
+    # Built as one list and written to out at once; many small NumPy writes would cost more than the values
+    for platform in nearest(world.platform_manager.nearby(view), x, ENV_PLATFORMS):
+        r = platform.rect
+        values += (1, (r.left - x) / w, (r.right - x) / w, (r.top - y) / w)
+    end = PLAYER_FEATURES + OBJECT_FEATURES * ENV_PLATFORMS
+    values += [0] * (end - len(values))  # Empty slots
+    for ladder in nearest(world.ladder_manager.nearby(view), x, ENV_LADDERS):
+        r = ladder.rect
+        values += (1, (r.centerx - x) / w, (r.top - y) / w, (r.bottom - y) / w)
+    end += OBJECT_FEATURES * ENV_LADDERS
+    values += [0] * (end - len(values))
+    for chest in nearest(world.chest_manager.nearby(view), x, ENV_CHESTS):
+        r = chest.rect
+        values += (1, (r.centerx - x) / w, (r.centery - y) / w, chest.collected)
+    end += OBJECT_FEATURES * ENV_CHESTS
+    values += [0] * (end - len(values))
+
+    # Enemies: pick the ones in view with one vectorized test, then sort the few left
+    store = world.enemy_manager.store
+    n = store.count
+    in_view = np.flatnonzero(store.alive[:n] & (np.abs(store.x[:n] - x) < ENV_VIEW)).tolist()
+    enemies = sorted(zip(store.x[in_view].tolist(), store.y[in_view].tolist(), store.speed[in_view].tolist()),
+                     key=lambda enemy: abs(enemy[0] - x))[:ENV_ENEMIES]
+    for ex, ey, speed in enemies:
+        values += (1, (ex - x) / w, (ey - y) / w, speed)
+    values += [0] * (OBS_SIZE - len(values))
+    out[:] = values
+
+
+class GameEnv:
+    """
+    One game as an environment: reset() starts a seeded level, step() plays the given actions.
+        - The reward of a step is the score gained during it.
+        - An episode ends after the game's length in ticks, as a game does in game.py.
+    """
+    def __init__(self, num_platforms=20, ticks=GAME_TICKS, frame_skip=1):
+        """
+        :param num_platforms: Number of platforms in each level.
+        :param ticks: Number of ticks an episode lasts.
+        :param frame_skip: Ticks every step() plays, holding the same actions.
+        """
+        self.num_platforms = num_platforms
+        self.ticks = ticks
+        self.frame_skip = frame_skip
+        self.world = None
+
+    @property
+    def score(self):
+        return self.world.player.score
+
+    def reset(self, seed, out=None):
+        """
+        Starts a new episode on the level generated from seed and returns its first observation.
+        :param seed: Seed for level generation.
+        :param out: Float array of OBS_SIZE values to write the observation to (a new one if None).
+        """
+        self.world = World(seed, self.num_platforms)
+        if out is None:
+            out = np.zeros(OBS_SIZE, dtype=np.float32)
+        observe(self.world, self.ticks, out)
+        return out
+
+    def step(self, actions, out=None):
+        """
+        Plays frame_skip ticks and returns (observation, reward, done).
+        :param actions: Bitmask of the actions held (see actions.py).
+        :param out: Float array of OBS_SIZE values to write the observation to (a new one if None).
+        """
+        world = self.world
+        score = world.player.score
+        for _ in range(min(self.frame_skip, self.ticks - world.tick)):
+            world.step(actions)
+        if out is None:
+            out = np.zeros(OBS_SIZE, dtype=np.float32)
+        observe(world, self.ticks, out)
+        return out, world.player.score - score, world.tick >= self.ticks
+
+
+class EnvGroup:
+    """
+    The environments numbered [start, stop) of a VectorEnv, reading their actions from and writing their
+    results to the shared buffers. Runs inside a worker process, or in the calling process without workers.
+    """
+    def __init__(self, buffers, start, stop, num_envs, options):
+        """
+        :param buffers: Shared arrays of the VectorEnv (see VectorEnv.allocate()).
+        :param start: First environment of the group.
+        :param stop: Environment after the last one of the group.
+        :param num_envs: Number of environments in the VectorEnv, which a finished environment adds to its seed.
+        :param options: Keyword arguments for GameEnv.
+        """
+        arrays = VectorEnv.arrays(buffers, num_envs)
+        self.observations, self.rewards, self.dones, self.scores, self.actions, self.seeds = (
+            array[start:stop] for array in arrays)
+        self.num_envs = num_envs
+        self.envs = [GameEnv(**options) for _ in range(start, stop)]
+
+    def reset(self):
+        """Starts every environment of the group on its seed."""
+        for i, env in enumerate(self.envs):
+            env.reset(int(self.seeds[i]), self.observations[i])
+        self.rewards[:] = 0
+        self.dones[:] = False
+        self.scores[:] = 0
+
+    def step(self):
+        """
+        Steps every environment of the group with its action. A finished environment records its final
+        score and starts over on its next seed, so the observation is already the new episode's first one.
+        """
+        observations, rewards, dones, scores, seeds = self.observations, self.rewards, self.dones, self.scores, self.seeds
+        for i, (env, actions) in enumerate(zip(self.envs, self.actions.tolist())):
+            _, rewards[i], dones[i] = env.step(actions, observations[i])
+            scores[i] = env.score
+            if dones[i]:
+                seeds[i] += self.num_envs
+                env.reset(int(seeds[i]), observations[i])
+
+
+def worker(connection, buffers, start, stop, num_envs, options):
+    """
+    Worker process: runs the commands sent over connection on its group of environments.
+    :param connection: End of the pipe to the VectorEnv.
+    :param buffers, start, stop, num_envs, options: See EnvGroup.
+    """
+    group = EnvGroup(buffers, start, stop, num_envs, options)
+    while True:
+        command = connection.recv()
+        if command == "close":
+            return
+        getattr(group, command)()
+        connection.send(True)
+
+
+class VectorEnv:
+    """
+    Steps num_envs independent games at once.
+        - The games are split into contiguous groups, one per worker process.
+        - Observations, rewards, dones, scores, actions and seeds live in shared memory, so a step only
+          sends a few bytes per worker over its pipe; step() returns NumPy views of the shared arrays.
+        - Seeds are assigned in lanes: environment i starts on seeds[i] and adds num_envs to it
+          whenever its episode ends, so no two episodes share a level.
+    """
+    def __init__(self, num_envs, workers=None, num_platforms=20, ticks=GAME_TICKS, frame_skip=1):
+        """
+        Allocates the shared buffers and starts the workers.
+        :param num_envs: Number of games.
+        :param workers: Number of worker processes (defaults to the number of cores; 0 steps them in this process).
+        :param num_platforms: Number of platforms in each level.
+        :param ticks: Number of ticks an episode lasts.
+        :param frame_skip: Ticks every step plays, holding the same actions.
+        """
+        if workers is None:
+            workers = os.cpu_count()
+        workers = min(workers, num_envs)
+        self.num_envs = num_envs
+        self.buffers = self.allocate(num_envs)
+        self.observations, self.rewards, self.dones, self.scores, self.actions, self.seeds = self.arrays(
+            self.buffers, num_envs)
+        options = {"num_platforms": num_platforms, "ticks": ticks, "frame_skip": frame_skip}
+
+        self.groups = []  # EnvGroup stepped in this process, if there are no workers
+        self.connections = []
+        self.processes = []
+        if workers == 0:
+            self.groups.append(EnvGroup(self.buffers, 0, num_envs, num_envs, options))
+        for w in range(workers):
+            start, stop = w * num_envs // workers, (w + 1) * num_envs // workers
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=worker, name=f"env-worker-{w}", daemon=True,
+                                              args=(worker_connection, self.buffers, start, stop, num_envs, options))
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    @staticmethod
+    def allocate(num_envs):
+        """Returns the shared buffers for num_envs environments."""
+        return {
+            "observations": RawArray("f", num_envs * OBS_SIZE),
+            "rewards": RawArray("f", num_envs),
+            "dones": RawArray("b", num_envs),
+            "scores": RawArray("i", num_envs),
+            "actions": RawArray("B", num_envs),
+            "seeds": RawArray("q", num_envs),
+        }
+
+    @staticmethod
+    def arrays(buffers, num_envs):
+        """Returns NumPy views of the shared buffers: observations, rewards, dones, scores, actions, seeds."""
+        return (
+            np.frombuffer(buffers["observations"], dtype=np.float32).reshape(num_envs, OBS_SIZE),
+            np.frombuffer(buffers["rewards"], dtype=np.float32),
+            np.frombuffer(buffers["dones"], dtype=np.bool_),
+            np.frombuffer(buffers["scores"], dtype=np.int32),
+            np.frombuffer(buffers["actions"], dtype=np.uint8),
+            np.frombuffer(buffers["seeds"], dtype=np.int64),
+        )
+
+    def run(self, command):
+        """Runs a command on every group and waits for all of them to finish."""
+        for connection in self.connections:
+            connection.send(command)
+        for group in self.groups:
+            getattr(group, command)()
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self, seeds):
+        """
+        Starts every game on a new level and returns the observations.
+        :param seeds: One seed per game, or a single seed: game i then starts on seed + i.
+        """
+        self.seeds[:] = np.arange(seeds, seeds + self.num_envs) if np.isscalar(seeds) else seeds
+        self.run("reset")
+        return self.observations
+
+    def step(self, actions):
+        """
+        Steps every game and returns (observations, rewards, dones). The arrays are reused by the next step.
+        :param actions: One action bitmask per game (see actions.py).
+        """
+        self.actions[:] = actions
+        self.run("step")
+        return self.observations, self.rewards, self.dones
+
+    def close(self):
+        """Stops the workers."""
+        for connection in self.connections:
+            connection.send("close")
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how many environment steps per second a VectorEnv runs.")
+    parser.add_argument("--envs", type=int, default=64, help="number of games")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (0 for none)")
+    parser.add_argument("--steps", type=int, default=1000, help="steps to time")
+    parser.add_argument("--frame-skip", type=int, default=1, help="ticks per step")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with VectorEnv(args.envs, args.workers, frame_skip=args.frame_skip) as env:
+        env.reset(0)
+        start = time.perf_counter()
+        episodes = 0
+        for _ in range(args.steps):
+            _, _, dones = env.step(rng.integers(0, 64, args.envs, dtype=np.uint8))
+            episodes += int(dones.sum())
+        elapsed = time.perf_counter() - start
+    steps = args.steps * args.envs
+    print(f"{steps} env-steps ({steps * args.frame_skip} ticks) in {elapsed:.2f} s: {steps / elapsed:,.0f} steps/s, "
+          f"{episodes} episodes finished")
+
+
+if __name__ == "__main__":
+    main()
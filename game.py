@@ -1,104 +1,228 @@
 ## Description: This file contains the main game loop.
 
-import pygame
-import sys
+import time
+
+STARTED = time.perf_counter()  # Start of the launch, for measuring the time to the first frame
+
+import logging
+import os
 import random
 
+import pygame
+
+import actions
+import atlas
+from assets import assets
 from background import BackgroundManager
-from objects.managers import PlatformManager, LadderManager, ChestManager, EnemyManager
-from player import Player
+from display import scaled_size, target
+from hud import HUD
+from profiler import profiler, ProfilerOverlay
+from renderer import Renderer
+from replay import Recording, write_recording
 from screens import StartScreen, GameOverScreen
-from settings import GROUND_LEVEL, SCREEN_WIDTH, SCREEN_HEIGHT, BACKGROUND, FPS, GAME_TIME    
-
-# Initialize Pygame
-pygame.init()
+from settings import (SCREEN_WIDTH, FPS, GAME_TIME, BACKGROUND, PRELOAD_IMAGES, PROFILE_TRACE_DIR,
+                      REPLAY_DIR, TELEMETRY_FILE, LOG_LEVEL)
+from telemetry import TelemetryWriter
+from timestep import FixedTimestep
+from world import World
+
+logger = logging.getLogger(__name__)
+
+def session_record(session, world, wall_time, reason):
+    """
+    Returns the telemetry record of a finished session.
+    :param session: Name of the session.
+    :param world: World of the session.
+    :param wall_time: Real time the session lasted, in seconds.
+    :param reason: "finished" if the game ran out of time, "quit" if the window was closed.
+    """
+    return {
+        "session": session,
+        "reason": reason,
+        "seed": world.seed,
+        "platforms": len(world.platform_manager.platforms),
+        "score": world.player.score,
+        "chests_opened": sum(chest.collected for chest in world.chest_manager.chests),
+        "ticks": world.tick,
+        "game_time_ms": world.time,
+        "wall_time_s": round(wall_time, 3),
+        "enemies": world.enemy_manager.store.stats(),  # Pool occupancy and allocations avoided
+        "assets": assets.stats(),  # Image cache hits and misses since launch
+        **profiler.summary(),
+    }
+
+def save_session(session, world, recording):
+    """
+    Writes the recording of the session that just ended to REPLAY_DIR and its profile to PROFILE_TRACE_DIR, if set.
+    :param session: Name of the session, used for the file names.
+    :param world: World of the session.
+    :param recording: Recording of the session's input.
+    """
+    if REPLAY_DIR:
+        recording.score = world.player.score
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        write_recording(os.path.join(REPLAY_DIR, f"{session}.replay"), recording)
+    if PROFILE_TRACE_DIR and profiler.trace:
+        os.makedirs(PROFILE_TRACE_DIR, exist_ok=True)
+        profiler.export(os.path.join(PROFILE_TRACE_DIR, f"{session}.csv"))
+
+class GameScene:
+    """
+    One game session: simulates the world at a fixed tick rate and draws a frame every time
+    through the main loop, so unlike the menus it never waits for events.
+    """
+    idle = False
+
+    def __init__(self, overlay, telemetry=None):
+        """
+        Creates the player, level, camera and everything needed to draw them.
+        :param overlay: ProfilerOverlay drawn on top of the game (toggled with F3).
+        :param telemetry: TelemetryWriter the session's record is sent to when it ends (None to skip).
+        """
+        self.overlay = overlay
+        self.telemetry = telemetry
+        self.started = time.perf_counter()
+        self.world = World()
+
+        # Record the seed and every tick's input so the session can be replayed (see replay.py)
+        self.session = time.strftime("session-%Y%m%d-%H%M%S")
+        self.recording = Recording(self.world.seed, len(self.world.platform_manager.platforms))
+
+        # Create background manager (clouds seeded too, so replays look the same)
+        self.background_manager = BackgroundManager(random.Random(self.world.seed))
+        self.renderer = Renderer(self.background_manager)  # Redraws only the parts of the screen that changed
+        self.hud = HUD(SCREEN_WIDTH)  # Score and time left
+
+        # The simulation runs at a fixed tick rate, independent of how fast frames are drawn
+        self.timestep = FixedTimestep()
+        profiler.reset()
+
+    def handle(self, event):
+        """
+        Handles one event. Returns the name of the next state, or None to stay.
+        :param event: Pygame event.
+        """
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.overlay.toggle()
+        elif event.type == pygame.VIDEORESIZE:
+            self.renderer.invalidate()  # The window was cleared around the render target
+        return None
+
+    def update(self, frame_time):
+        """
+        Simulates as many ticks as fit in the time since the last frame.
+        Returns "game over" once 30 seconds of game time have passed.
+        :param frame_time: Time since the last frame in seconds.
+        """
+        world = self.world
+        if world.time >= GAME_TIME:
+            self.save("finished")
+            return "game over"
+
+        profiler.begin_frame()
+        with profiler.scope("input"):
+            held = actions.from_keys(pygame.key.get_pressed())
+        for _ in range(self.timestep.advance(frame_time)):
+            world.step(held)
+            self.recording.record(held)
+            with profiler.scope("clouds"):
+                self.background_manager.update_clouds()
+        return None
+
+    def draw(self, screen):
+        """
+        Draws the frame and sends the changed parts of the screen to the display.
+        :param screen: Pygame screen surface.
+        """
+        world = self.world
+
+        # Erase last frame's sprites and redraw the background where needed
+        with profiler.scope("draw background"):
+            background_rects = self.renderer.begin_frame(screen)
+
+        # Draw the player, platforms, ladders, chests and enemies between the last two ticks
+        sprite_rects = world.draw(screen, self.timestep.alpha)
+
+        # Draw the score and the time left
+        with profiler.scope("draw hud"):
+            sprite_rects += self.hud.draw(screen, world.player.score, GAME_TIME - world.time)
+        sprite_rects += self.overlay.draw(screen)
+
+        # Send only the changed parts of the screen to the display
+        with profiler.scope("present"):
+            self.renderer.present(background_rects, sprite_rects)
+        profiler.end_frame()
+
+    def save(self, reason):
+        """
+        Saves the recording and profile of the session and queues its telemetry record.
+        :param reason: "finished" if the game ran out of time, "quit" if the window was closed.
+        """
+        save_session(self.session, self.world, self.recording)
+        if self.telemetry:
+            # Never blocks: if the writer has fallen behind, the record is dropped and counted
+            self.telemetry.record(session_record(self.session, self.world, time.perf_counter() - self.started, reason))
 
 def main():
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Peaceful Platformer")
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+    profiler.enabled = True
+    overlay = ProfilerOverlay(profiler)  # Toggled with F3
+    telemetry = TelemetryWriter(TELEMETRY_FILE) if TELEMETRY_FILE else None  # Session records, written in the background
+
+    # Initialize only the Pygame modules the game uses (no audio or joysticks)
+    pygame.display.init()
+    pygame.font.init()
+    screen = target.open("Peaceful Platformer")  # The render target, RENDER_SCALE times the screen size
     clock = pygame.time.Clock()
 
-    # Display start screen & Initialize game over screen
-    game_over_screen = GameOverScreen()
+    # Show the start screen's background right away, then load everything else
+    screen.fill(BACKGROUND)
+    target.present()
+    logger.info("First frame after %.0f ms", (time.perf_counter() - STARTED) * 1000)
+
+    # The sprite atlas and the menu images load on background threads while the player is on the start screen
+    atlas.preload()
+    assets.preload([(name, scaled_size(size)) for name, size in PRELOAD_IMAGES])
+
+    # Initialize start screen & game over screen
     start_screen = StartScreen()
-    
-    # Start the game loop
-    running = True
-    while running:
-        start_screen.display(screen)  # Show the start screen
-        
-        # Create player instance
-        player = Player()
-
-        # Create platforms (x, y, width, height)
-        platform_manager = PlatformManager()
-        platform_manager.generate_platforms(20, SCREEN_HEIGHT)
-
-        # Create ladders
-        ladder_manager = LadderManager()
-        ladder_manager.place_ladders(platform_manager.platforms, GROUND_LEVEL)
-        
-        # Create chests
-        chest_manager = ChestManager()
-        chest_manager.place_chests(platform_manager.platforms)
-
-        # Create background manager
-        background_manager = BackgroundManager()
-
-        # Spawn enemies
-        enemy_manager = EnemyManager()
-        enemy_manager.generate_enemies(SCREEN_WIDTH, GROUND_LEVEL)
-
-        start_ticks = pygame.time.get_ticks()  # Start time in milliseconds
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            # Check if 30 seconds have passed
-            if pygame.time.get_ticks() - start_ticks >= GAME_TIME: 
-                if game_over_screen.display(screen, player.score):  # Restart if True
-                    break  # Exit the current loop to restart the game
-
-            # Get current time
-            current_time = pygame.time.get_ticks()
-            # Update player
-            player.update(platform_manager.platforms, ladder_manager.ladders, chest_manager.chests, enemy_manager.enemies, platform_manager.level_width)
-
-            # Move platforms only when the level scrolls
-            platform_manager.update(player.scroll_speed if player.rect.x >= 2 * SCREEN_WIDTH // 4 else 0)
-            ladder_manager.update(player.scroll_speed if player.rect.x >= 2 * SCREEN_WIDTH // 4 else 0)
-            chest_manager.update(player.scroll_speed if player.rect.x >= 2 * SCREEN_WIDTH // 4 else 0)
-            enemy_manager.update(current_time, SCREEN_WIDTH, player.scroll_speed if player.rect.x >= 2 * SCREEN_WIDTH // 4 else 0, GROUND_LEVEL)
-            background_manager.update_clouds()
-            
-            # Draw background
-            background_manager.draw(screen)
-
-            # Draw player
-            player.draw(screen)
-
-            # Draw platforms, ladders, and chests
-            platform_manager.draw(screen)
-            ladder_manager.draw(screen)
-            chest_manager.draw(screen)
-
-            # Draw enemies
-            enemy_manager.draw(screen)
-
-            # Render the score
-            font = pygame.font.Font(None, 36)  # Use a Pygame font
-            score_text = font.render(f"Score: {player.score}", True, (255, 255, 255))  # White text
-            screen.blit(score_text, (10, 10))  # Draw score in the top-left corner
-
-            pygame.display.flip()
-
-            # Limit frames per second
-            clock.tick(FPS)
-
-    pygame.quit()
+    game_over_screen = GameOverScreen()
+    logger.info("Start screen ready after %.0f ms", (time.perf_counter() - STARTED) * 1000)
+
+    # The game is a state machine: the start screen, a game session, or the game over screen.
+    # Menus sleep until an event arrives; the game runs at FPS frames per second.
+    scene = start_screen
+    start_screen.enter()
+    while True:
+        events = pygame.event.get() if not scene.idle else [pygame.event.wait()] + pygame.event.get()
+
+        next_state = None
+        for event in events:
+            if event.type == pygame.QUIT:
+                if isinstance(scene, GameScene):
+                    scene.save("quit")  # Keep the recording of a session that was quit halfway
+                if telemetry:
+                    telemetry.close()  # Write the buffered records before exiting
+                pygame.quit()
+                return
+            target.handle(event)  # Fit the render target into a resized window
+            next_state = scene.handle(event) or next_state
+
+        if not next_state:
+            # Limit frames per second and measure how long the last frame took
+            frame_time = clock.tick(FPS) / 1000 if not scene.idle else 0
+            next_state = scene.update(frame_time)
+
+        if next_state == "start":
+            start_screen.enter()
+            scene = start_screen
+        elif next_state == "game":
+            scene = GameScene(overlay, telemetry)
+            clock.tick()  # Don't count the time spent on the menu
+        elif next_state == "game over":
+            game_over_screen.enter(scene.world.player.score)
+            scene = game_over_screen
+        scene.draw(screen)
 
 
 if __name__ == "__main__":
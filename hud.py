@@ -0,0 +1,175 @@
+# Description: This file contains the heads-up display (score and timer) and the font and text caches it draws with.
+from collections import OrderedDict
+
+import pygame
+from display import scaled
+from settings import HUD_FONT_SIZE, HUD_COLOR, TEXT_CACHE_SIZE, RENDER_SCALE
+
+
+class TextCache:
+    """
+    Owns the fonts and the rendered text surfaces used for on-screen text.
+        - Each font is created once per size.
+        - Rendered text is keyed by (text, size, color), so unchanged text is never rendered twice.
+        - The least recently used text is evicted once the cache is full.
+    """
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        """
+        Initializes empty caches.
+        :param max_entries: Maximum number of rendered text surfaces kept in memory.
+        """
+        self.max_entries = max_entries
+        self.fonts = {}  # size -> pygame.font.Font
+        self.entries = OrderedDict()  # (text, size, color) -> surface
+
+    def font(self, size):
+        """
+        Returns the default font at the given size.
+        :param size: Font size in pixels.
+        """
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, size, color=HUD_COLOR):
+        """
+        Returns text rendered (antialiased) in the default font.
+        :param text: Text to render.
+        :param size: Font size in pixels.
+        :param color: Text color.
+        """
+        key = (text, size, color)
+        surface = self.entries.get(key)
+        if surface is None:
+            surface = self.entries[key] = self.font(size).render(text, True, color)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return surface
+
+
+# Shared cache used by the HUD, the screens and the profiler overlay
+text_cache = TextCache()
+
+
+def render_text(text, size, color=HUD_COLOR):
+    """
+    Shortcut for text_cache.render().
+    :param text: Text to render.
+    :param size: Font size in pixels.
+    :param color: Text color.
+    """
+    return text_cache.render(text, size, color)
+
+
+class GlyphAtlas:
+    """
+    A fixed set of characters (e.g. digits) rendered once side by side into one surface.
+    Numbers that change often are drawn by blitting the glyphs out of the atlas instead
+    of rendering new text surfaces.
+        - Every glyph gets a cell as wide as the widest one, so numbers don't shift as digits change.
+    """
+    def __init__(self, size, color=HUD_COLOR, characters="0123456789:"):
+        """
+        Renders the characters into the atlas.
+        :param size: Font size in pixels.
+        :param color: Text color.
+        :param characters: Characters that can be drawn from the atlas.
+        """
+        glyphs = [text_cache.font(size).render(character, True, color) for character in characters]
+        self.cell_width = max(glyph.get_width() for glyph in glyphs)
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pygame.Surface((self.cell_width * len(glyphs), self.height), pygame.SRCALPHA)
+        self.areas = {}  # character -> area of its cell in the atlas
+        for i, (character, glyph) in enumerate(zip(characters, glyphs)):
+            x = i * self.cell_width + (self.cell_width - glyph.get_width()) // 2  # Centre the glyph in its cell
+            self.surface.blit(glyph, (x, 0))
+            self.areas[character] = pygame.Rect(i * self.cell_width, 0, self.cell_width, self.height)
+
+    def layout(self, text, pos):
+        """
+        Returns the blit sequence drawing text at pos, for use with Surface.blits.
+        :param text: Text made only of the atlas's characters.
+        :param pos: (x, y) of the top-left corner of the text.
+        """
+        x, y = pos
+        return [(self.surface, (x + i * self.cell_width, y), self.areas[character]) for i, character in enumerate(text)]
+
+    def width(self, text):
+        """Returns the width of text drawn from the atlas."""
+        return len(text) * self.cell_width
+
+
+class Counter:
+    """
+    A label followed by a value drawn from a GlyphAtlas. The blit sequence is only rebuilt
+    when the value changes, so drawing an unchanged counter allocates nothing.
+    """
+    def __init__(self, label, atlas, pos, size=HUD_FONT_SIZE):
+        """
+        :param label: Text in front of the value (rendered once).
+        :param atlas: GlyphAtlas to draw the value with.
+        :param pos: (x, y) of the top-left corner of the label.
+        :param size: Font size of the label.
+        """
+        self.label = render_text(label, size)
+        self.atlas = atlas
+        self.pos = pos
+        self.text = None
+        self.blits = []
+        self.rect = None
+
+    def set(self, text):
+        """
+        Sets the value shown after the label.
+        :param text: New value as text made only of the atlas's characters.
+        """
+        if text == self.text:
+            return
+        self.text = text
+        x, y = self.pos
+        value_pos = (x + self.label.get_width(), y + (self.label.get_height() - self.atlas.height) // 2)
+        self.blits = [(self.label, self.pos)] + self.atlas.layout(text, value_pos)
+        self.rect = pygame.Rect(self.pos, (self.label.get_width() + self.atlas.width(text),
+                                           max(self.label.get_height(), self.atlas.height)))
+
+    def draw(self, screen):
+        """
+        Draws the counter and returns the screen area drawn to.
+        :param screen: Pygame screen surface.
+        """
+        screen.blits(self.blits, doreturn=False)
+        return self.rect
+
+
+class HUD:
+    """
+    The score in the top-left corner and the time left in the top centre, drawn at the render target's scale.
+    """
+    def __init__(self, screen_width, scale=RENDER_SCALE):
+        """
+        Builds the digit atlas and the counters.
+        :param screen_width: Width of the screen, used to centre the timer.
+        :param scale: Size of the render target relative to the screen size (see display.py).
+        """
+        size = scaled(HUD_FONT_SIZE, scale)
+        self.atlas = GlyphAtlas(size)
+        self.score = Counter("Score: ", self.atlas, (scaled(10, scale),) * 2, size)
+        self.timer = Counter("Time: ", self.atlas, (scaled(screen_width // 2 - 60, scale), scaled(10, scale)), size)
+        self.shown = (None, None)  # (score, seconds) currently shown
+
+    def draw(self, screen, score, time_left):
+        """
+        Draws the score and the timer and returns the screen areas drawn to.
+        :param screen: Pygame screen surface.
+        :param score: Player's score.
+        :param time_left: Time left in the game in milliseconds.
+        """
+        seconds = max(0, time_left + 999) // 1000  # Round up, so the timer reads 0:00 only when time is up
+        if (score, seconds) != self.shown:
+            self.shown = (score, seconds)
+            self.score.set(str(score))
+            self.timer.set(f"{seconds // 60}:{seconds % 60:02d}")
+        return [self.score.draw(screen), self.timer.draw(screen)]
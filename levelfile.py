@@ -0,0 +1,196 @@
+# Description: This file contains the binary level file format. Files are memory-mapped, and only the part of
+# the level near the camera is turned into game objects.
+# Run from the repository root with: python levelfile.py --platforms 1000000 --out big.level
+import argparse
+import mmap
+import struct
+
+import numpy as np
+from levels import generate_level
+from objects.chest import Chest
+from objects.ladder import Ladder
+from objects.platform import Platform
+from settings import SCREEN_WIDTH
+
+# Level file layout (little-endian):
+#   header (64 bytes): magic, version, seed (-1 if unknown), level width, number of platforms, ladders,
+#                      chests and enemy spawns, and the widest platform, ladder and chest
+#   platforms, ladders, chests: x, y, width and height columns of int32, sorted by x
+#   enemy spawns: x, y and speed columns of int32, sorted by x
+# Each column is stored in one piece so it can be used in place as a NumPy array.
+LEVEL_MAGIC = b"PPLV"
+LEVEL_VERSION = 1
+HEADER = struct.Struct("<4sH2xqi4I3i")
+HEADER_SIZE = 64
+COLUMN_TYPE = np.dtype("<i4")
+
+
+class RectRecords:
+    """
+    Zero-copy view of one kind of rect record (platforms, ladders or chests) in a level file.
+    """
+    def __init__(self, x, y, width, height, max_width):
+        """
+        :param x, y, width, height: NumPy columns, sorted by x.
+        :param max_width: Widest rect, bounds how far left a range query has to look.
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.max_width = max_width
+
+    def __len__(self):
+        return len(self.x)
+
+    def span(self, left, right):
+        """
+        Returns the range (start, stop) of records that may overlap the x-range [left, right].
+        :param left: Left end of the range.
+        :param right: Right end of the range.
+        """
+        # Search with int32 keys; Python ints would make NumPy convert the whole column first
+        keys = np.array([left - self.max_width, right], dtype=COLUMN_TYPE)
+        start = int(self.x.searchsorted(keys[0], "left"))
+        stop = int(self.x.searchsorted(keys[1], "right"))
+        return start, stop
+
+    def rect(self, i):
+        """Returns record i as an (x, y, width, height) tuple."""
+        return int(self.x[i]), int(self.y[i]), int(self.width[i]), int(self.height[i])
+
+
+class LevelFile:
+    """
+    A level file opened with mmap. Nothing is read until a record is used, so opening even a
+    very large level is instant and only the pages that are touched take up memory.
+    """
+    def __init__(self, path):
+        """
+        Maps the level file into memory.
+        :param path: Level file written by write_level_file.
+        """
+        with open(path, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, seed, self.level_width, num_platforms, num_ladders, num_chests, num_enemies,
+         *max_widths) = HEADER.unpack_from(self.mmap)
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise ValueError(f"{path} is not a version {LEVEL_VERSION} level file")
+        self.seed = None if seed < 0 else seed
+
+        self.offset = HEADER_SIZE
+        self.platforms = RectRecords(*self.columns(num_platforms, 4), max_widths[0])
+        self.ladders = RectRecords(*self.columns(num_ladders, 4), max_widths[1])
+        self.chests = RectRecords(*self.columns(num_chests, 4), max_widths[2])
+        self.enemy_x, self.enemy_y, self.enemy_speed = self.columns(num_enemies, 3)
+
+    def columns(self, count, num_columns):
+        """Returns the next num_columns columns of count values as NumPy views into the file."""
+        columns = []
+        for _ in range(num_columns):
+            columns.append(np.frombuffer(self.mmap, COLUMN_TYPE, count, self.offset))
+            self.offset += count * COLUMN_TYPE.itemsize
+        return columns
+
+
+def write_level_file(path, level, enemy_spawns=()):
+    """
+    Writes a level to a level file.
+    :param path: File to write to.
+    :param level: Level (see levels.py) to store.
+    :param enemy_spawns: (x, y, speed) of enemies placed in the level.
+    """
+    kinds = []
+    for rects in (level.platforms, level.ladders, level.chests):
+        records = np.array(sorted(tuple(rect) for rect in rects), dtype=COLUMN_TYPE).reshape(-1, 4)
+        kinds.append(records)
+    spawns = np.array(sorted(enemy_spawns), dtype=COLUMN_TYPE).reshape(-1, 3)
+
+    header = HEADER.pack(
+        LEVEL_MAGIC, LEVEL_VERSION, -1 if level.seed is None else level.seed, level.level_width,
+        *(len(records) for records in kinds), len(spawns),
+        *(int(records[:, 2].max(initial=0)) for records in kinds),
+    )
+    with open(path, "wb") as file:
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        for records in kinds + [spawns]:
+            for column in records.T:
+                file.write(np.ascontiguousarray(column).tobytes())
+
+
+class MappedLevel:
+    """
+    Keeps the world's managers filled with the objects of a LevelFile that are near the camera.
+        - Records within margin pixels of the screen become Platform, Ladder and Chest objects;
+          objects that fall outside that range are dropped again.
+        - Opened chests are remembered, so they stay open when they are loaded again.
+        - Enemy spawns are created once, when they come within range.
+    """
+    def __init__(self, level_file, margin=SCREEN_WIDTH):
+        """
+        :param level_file: LevelFile to load objects from.
+        :param margin: How far beyond the screen edges objects are kept loaded.
+        """
+        self.level_file = level_file
+        self.seed = level_file.seed
+        self.level_width = level_file.level_width
+        self.margin = margin
+        self.loaded = {"platforms": {}, "ladders": {}, "chests": {}}  # Record index -> object
+        self.spans = {"platforms": (0, 0), "ladders": (0, 0), "chests": (0, 0)}  # Loaded record ranges
+        self.opened_chests = set()  # Record indices of chests opened while loaded
+        self.next_enemy = 0  # First enemy spawn not created yet
+
+    def update(self, world):
+        """
+        Loads the objects that came near the camera and unloads those that went out of range.
+        :param world: World whose managers should hold the loaded objects.
+        """
+        left = world.camera.x - self.margin
+        right = world.camera.x + world.camera.width + self.margin
+
+        for kind, manager, create in (
+            ("platforms", world.platform_manager, Platform),
+            ("ladders", world.ladder_manager, Ladder),
+            ("chests", world.chest_manager, Chest),
+        ):
+            records = getattr(self.level_file, kind)
+            start, stop = records.span(left, right)
+            if (start, stop) == self.spans[kind]:
+                continue
+            self.spans[kind] = (start, stop)
+            loaded = self.loaded[kind]
+
+            for i in [i for i in loaded if not start <= i < stop]:
+                obj = loaded.pop(i)
+                if kind == "chests" and obj.collected:
+                    self.opened_chests.add(i)
+                manager.remove(obj)
+            for i in range(start, stop):
+                if i not in loaded:
+                    obj = create(*records.rect(i))
+                    if kind == "chests":
+                        obj.collected = i in self.opened_chests
+                    loaded[i] = obj
+                    manager.add(obj)
+
+        level_file = self.level_file
+        while self.next_enemy < len(level_file.enemy_x) and level_file.enemy_x[self.next_enemy] <= right:
+            i = self.next_enemy
+            world.enemy_manager.store.add(int(level_file.enemy_x[i]), int(level_file.enemy_y[i]),
+                                          int(level_file.enemy_speed[i]))
+            self.next_enemy += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a level and write it to a level file.")
+    parser.add_argument("--seed", type=int, default=0, help="seed for level generation")
+    parser.add_argument("--platforms", type=int, default=20, help="number of platforms")
+    parser.add_argument("--out", default="level.level", help="level file to write")
+    args = parser.parse_args()
+
+    write_level_file(args.out, generate_level(args.seed, args.platforms))
+    print(f"Wrote level {args.seed} with {args.platforms} platforms to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# Description: This file generates seeded levels, checks that they can be completed, and stores them in level packs.
+# Run from the repository root with: python levels.py --count 10000 --out levels.pack
+import argparse
+import functools
+import multiprocessing
+import os
+import random
+import struct
+
+import pygame
+from navigation import NavGraph
+from objects.managers import PlatformManager, LadderManager, ChestManager
+from settings import SCREEN_HEIGHT, GROUND_LEVEL, NAV_CACHE_SIZE
+
+# Level pack layout (little-endian):
+#   header: magic, version, number of levels
+#   per level: seed, level width, valid flag, number of platforms, ladders and chests,
+#              followed by one (x, y, width, height) record per platform, ladder and chest
+PACK_MAGIC = b"PPLP"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sHI")
+LEVEL_HEADER = struct.Struct("<qiBIII")
+RECT_RECORD = struct.Struct("<4i")
+
+
+def create_managers(rng, num_platforms=20):
+    """
+    Builds the platform, ladder and chest managers for a new level.
+    :param rng: Random number generator to use (e.g. a seeded random.Random).
+    :param num_platforms: Number of platforms in the level.
+    """
+    platform_manager = PlatformManager()
+    platform_manager.generate_platforms(num_platforms, SCREEN_HEIGHT, rng)
+    ladder_manager = LadderManager()
+    ladder_manager.place_ladders(platform_manager.platforms, GROUND_LEVEL)
+    chest_manager = ChestManager()
+    chest_manager.place_chests(platform_manager.platforms, rng)
+    return platform_manager, ladder_manager, chest_manager
+
+
+class Level:
+    """
+    The layout of one level as plain rects, without images or game state.
+    """
+    def __init__(self, seed, level_width, platforms, ladders, chests, valid=None):
+        """
+        :param seed: Seed the level was generated from.
+        :param level_width: Width of the level in pixels.
+        :param platforms: List of platform rects (pygame.Rect), sorted by x.
+        :param ladders: List of ladder rects.
+        :param chests: List of chest rects.
+        :param valid: Whether every chest can be reached (None if not checked yet).
+        """
+        self.seed = seed
+        self.level_width = level_width
+        self.platforms = platforms
+        self.ladders = ladders
+        self.chests = chests
+        self.valid = valid
+        self.graph = None  # NavGraph, built by nav_graph()
+
+    def nav_graph(self):
+        """Returns the NavGraph of the level, building it on the first call."""
+        if self.graph is None:
+            self.graph = NavGraph(self.platforms, self.ladders, GROUND_LEVEL)
+        return self.graph
+
+    def unreachable_chests(self):
+        """Returns the chests whose platform the player can't get onto."""
+        graph = self.nav_graph()
+        return [chest for chest in self.chests if not graph.can_reach_chest(chest)]
+
+    def validate(self):
+        """Checks that every chest can be reached, stores the result in valid and returns it."""
+        self.valid = not self.unreachable_chests()
+        return self.valid
+
+
+def generate_level(seed, num_platforms=20):
+    """
+    Generates the level World(seed, num_platforms) would play.
+    :param seed: Seed for level generation.
+    :param num_platforms: Number of platforms in the level.
+    """
+    platform_manager, ladder_manager, chest_manager = create_managers(random.Random(seed), num_platforms)
+    return Level(
+        seed,
+        platform_manager.level_width,
+        [platform.rect for platform in platform_manager.platforms],
+        [ladder.rect for ladder in ladder_manager.ladders],
+        [chest.rect for chest in chest_manager.chests],
+    )
+
+
+@functools.lru_cache(maxsize=NAV_CACHE_SIZE)
+def level_graph(seed, num_platforms=20):
+    """
+    Returns the NavGraph of the level World(seed, num_platforms) would play. Graphs are cached by seed,
+    so enemy AI and QA tools asking about the same level share one graph and its path trees.
+    :param seed: Seed for level generation.
+    :param num_platforms: Number of platforms in the level.
+    """
+    return generate_level(seed, num_platforms).nav_graph()
+
+
+def generate_and_validate(seed, num_platforms=20):
+    """Generates and validates one level (used by the worker processes)."""
+    level = generate_level(seed, num_platforms)
+    level.validate()
+    return level
+
+
+def pack_level(level):
+    """Returns the level pack record for one level."""
+    record = [LEVEL_HEADER.pack(level.seed, level.level_width, bool(level.valid),
+                                len(level.platforms), len(level.ladders), len(level.chests))]
+    for rect in level.platforms + level.ladders + level.chests:
+        record.append(RECT_RECORD.pack(*rect))
+    return b"".join(record)
+
+
+def write_level_pack(path, seeds, num_platforms=20, processes=None, keep_invalid=False):
+    """
+    Generates and validates a level for every seed on all cores and writes them to a level pack.
+    Returns (number of levels generated, number of levels written).
+    :param path: File to write the level pack to.
+    :param seeds: Iterable of seeds to generate levels from.
+    :param num_platforms: Number of platforms per level.
+    :param processes: Number of worker processes (defaults to the number of cores).
+    :param keep_invalid: Also write levels with unreachable chests.
+    """
+    generated = written = 0
+    with open(path, "wb") as pack, multiprocessing.Pool(processes) as pool:
+        pack.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0))
+        job = functools.partial(generate_and_validate, num_platforms=num_platforms)
+        for level in pool.imap(job, seeds, chunksize=64):
+            generated += 1
+            if level.valid or keep_invalid:
+                pack.write(pack_level(level))
+                written += 1
+
+        # Now that the number of levels is known, fill it in
+        pack.seek(0)
+        pack.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, written))
+    return generated, written
+
+
+def read_level_pack(path):
+    """
+    Yields every Level stored in a level pack.
+    :param path: Level pack file written by write_level_pack.
+    """
+    with open(path, "rb") as pack:
+        data = pack.read()
+    magic, version, count = PACK_HEADER.unpack_from(data)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"{path} is not a version {PACK_VERSION} level pack")
+
+    offset = PACK_HEADER.size
+    for _ in range(count):
+        seed, level_width, valid, num_platforms, num_ladders, num_chests = LEVEL_HEADER.unpack_from(data, offset)
+        offset += LEVEL_HEADER.size
+        rects = [pygame.Rect(RECT_RECORD.unpack_from(data, offset + i * RECT_RECORD.size))
+                 for i in range(num_platforms + num_ladders + num_chests)]
+        offset += len(rects) * RECT_RECORD.size
+        yield Level(seed, level_width, rects[:num_platforms],
+                    rects[num_platforms:num_platforms + num_ladders],
+                    rects[num_platforms + num_ladders:], bool(valid))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and validate a pack of seeded levels.")
+    parser.add_argument("--count", type=int, default=1000, help="number of levels to generate")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first level")
+    parser.add_argument("--platforms", type=int, default=20, help="platforms per level")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--keep-invalid", action="store_true", help="also store levels with unreachable chests")
+    parser.add_argument("--out", default="levels.pack", help="level pack to write")
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.count)
+    generated, written = write_level_pack(args.out, seeds, args.platforms, args.processes, args.keep_invalid)
+    print(f"Generated {generated} levels, wrote {written} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# Description: This file works out which platforms the player can reach, and how, using the jump arc from the player settings.
+import functools
+import math
+from bisect import bisect_left, bisect_right
+
+from settings import PLAYER_JUMP_POWER, PLAYER_JUMP_FORWARD_SPEED, PLAYER_SPEED, GRAVITY, SCREEN_HEIGHT
+
+# How far the ladder reaches below a platform's top, and how close the player's midpoint
+# has to be to the ladder's centre to touch it (player is 100x100, ladders are 20 wide)
+LADDER_HEIGHT = 100
+PLAYER_HEIGHT = 100
+LADDER_GRAB_DISTANCE = 60
+# Player.update starts climbing whenever the player touches a ladder with UP held, in the air too,
+# so a ladder can be grabbed anywhere along a jump: the player touches it while their feet are less
+# than LADDER_HEIGHT + PLAYER_HEIGHT below its top
+LADDER_REACH = LADDER_HEIGHT + PLAYER_HEIGHT
+
+GROUND = -1  # Node of the ground in a NavGraph
+
+
+@functools.lru_cache(maxsize=None)
+def jump_arc(headroom=math.inf):
+    """
+    Replays the vertical moves of a jump the way Player.update makes them, tick by tick: the player
+    moves 2*v + 3*G pixels and 2*G is added to the velocity v, the rect keeps whole pixels, and the
+    top of the screen stops the rise (the player stays there and falls from rest).
+    Returns (peak, falling, drops): the highest rise, the first tick the player can land on (when
+    they are moving down), and minus the rise after each tick from the one before it, in increasing order.
+    Arcs are cached by headroom.
+    :param headroom: How far the player can rise before their head reaches the top of the screen.
+    """
+    rises = [0]
+    velocity = -PLAYER_JUMP_POWER
+    falling = None
+    while rises[-1] > -SCREEN_HEIGHT:  # Nothing is farther below the take-off surface than that
+        move = 2 * (velocity + GRAVITY) + GRAVITY
+        velocity += 2 * GRAVITY
+        if falling is None and velocity > 0:
+            falling = len(rises)
+        rise = rises[-1] - math.floor(move)
+        if rise > headroom:
+            rise, velocity = headroom, max(velocity, 0)
+        rises.append(rise)
+    return max(rises), falling, [-rise for rise in rises[falling - 1:]]
+
+
+MAX_JUMP_HEIGHT = jump_arc()[0]
+MAX_LADDER_HEIGHT = MAX_JUMP_HEIGHT + LADDER_REACH  # Highest ladder top above the take-off surface
+
+
+def jump_reach(height, headroom=math.inf):
+    """
+    Returns how far the player's midpoint can travel sideways during a jump that lands on a
+    surface height pixels above the take-off surface (negative for lower surfaces),
+    or None if the jump can't get that high.
+    :param height: Height of the landing surface above the take-off surface.
+    :param headroom: How far the player can rise before their head reaches the top of the screen.
+    """
+    peak, falling, drops = jump_arc(headroom)
+    if height > peak:
+        return None
+    # Landing is tested along the whole move from where the feet were (see first_landing in player.py),
+    # so the player can land as late as the first tick moving down that ends below the surface
+    landing_tick = falling - 1 + max(min(bisect_right(drops, -height), len(drops) - 1), 1)
+    # The player lands before moving sideways on the landing tick; the first tick moves at jump speed
+    return PLAYER_JUMP_FORWARD_SPEED + PLAYER_SPEED * max(landing_tick - 2, 0)
+
+
+def gap(left, right, rect):
+    """
+    Returns the horizontal distance between the span [left, right] and the rect (0 if they overlap).
+    :param left: Left end of the span.
+    :param right: Right end of the span.
+    :param rect: pygame.Rect to measure to.
+    """
+    return max(rect.left - right, left - rect.right, 0)
+
+
+class NavGraph:
+    """
+    Which surfaces the player can move between, worked out once per level from the jump arc and the ladders.
+        - Nodes are platform indices, plus GROUND for the ground, which runs along the whole level.
+        - An edge is one move: a jump (the platform is high and close enough, see jump_reach),
+          a ladder climb (the player can touch the ladder standing, or anywhere along a jump from the
+          surface until they are back on the ground), or dropping to the ground.
+        - Shortest paths count moves. The breadth-first tree from a start node is built on the first
+          query from it and kept, so later queries only walk back up the tree.
+    """
+    def __init__(self, platforms, ladders, ground_level):
+        """
+        Builds the edges of every node and the tree of moves from the ground.
+        :param platforms: List of platform rects (pygame.Rect) sorted by x.
+        :param ladders: List of ladder rects (pygame.Rect).
+        :param ground_level: Y-coordinate of the ground.
+        """
+        self.platforms = platforms
+        self.ground_level = ground_level
+        self.lefts = [platform.left for platform in platforms]
+        self.max_width = max((platform.width for platform in platforms), default=0)
+        self.max_reach = jump_reach(min(-ground_level, 0)) or 0  # Longest possible jump, falling off the screen
+
+        # Platform each ladder leads up to
+        self.ladder_tops = {}
+        for ladder in ladders:
+            for i in range(bisect_left(self.lefts, ladder.centerx - self.max_width),
+                           bisect_right(self.lefts, ladder.centerx)):
+                platform = platforms[i]
+                if platform.top == ladder.top and platform.left <= ladder.centerx <= platform.right:
+                    self.ladder_tops.setdefault(i, []).append(ladder)
+
+        self.edges = {GROUND: list(self.neighbours(-math.inf, math.inf, ground_level))}
+        for i, platform in enumerate(platforms):
+            # The ground is always one drop away
+            self.edges[i] = [GROUND] + [j for j in self.neighbours(platform.left, platform.right, platform.top) if j != i]
+        self.tops = {(platform.centerx, platform.top): i for i, platform in enumerate(platforms)}
+        self.trees = {}  # Start node -> {node: node it is reached from}
+        self.reachable = set(self.tree(GROUND)) - {GROUND}  # Platforms the player can stand on
+
+    def neighbours(self, left, right, surface_y):
+        """
+        Yields the platforms that can be reached in one move from a surface.
+        :param left: Left end of the surface.
+        :param right: Right end of the surface.
+        :param surface_y: Y-coordinate of the surface.
+        """
+        platforms, lefts = self.platforms, self.lefts
+        headroom = surface_y - PLAYER_HEIGHT
+        lo = bisect_left(lefts, left - self.max_reach - LADDER_GRAB_DISTANCE - self.max_width)
+        hi = bisect_right(lefts, right + self.max_reach + LADDER_GRAB_DISTANCE)
+        for i in range(lo, hi):
+            platform = platforms[i]
+            height = surface_y - platform.top
+            reach = jump_reach(height, headroom)
+            if reach is not None and gap(left, right, platform) <= reach:
+                yield i
+            elif height < MAX_LADDER_HEIGHT and i in self.ladder_tops:
+                # Sideways distance covered until the player's feet drop below the ladder's reach (or hit the ground)
+                reach = jump_reach(max(height - LADDER_REACH, surface_y - self.ground_level), headroom)
+                if reach is None:
+                    continue
+                for ladder in self.ladder_tops[i]:
+                    if left - LADDER_GRAB_DISTANCE - reach < ladder.centerx < right + LADDER_GRAB_DISTANCE + reach:
+                        yield i
+                        break
+
+    def tree(self, start):
+        """
+        Returns the breadth-first tree of moves from start, as {node: node it is reached from}.
+        :param start: Platform index or GROUND.
+        """
+        tree = self.trees.get(start)
+        if tree is None:
+            tree = {start: None}
+            frontier = [start]
+            while frontier:
+                next_frontier = []
+                for node in frontier:
+                    for neighbour in self.edges[node]:
+                        if neighbour not in tree:
+                            tree[neighbour] = node
+                            next_frontier.append(neighbour)
+                frontier = next_frontier
+            self.trees[start] = tree
+        return tree
+
+    def path(self, start, goal):
+        """
+        Returns the nodes on a shortest path from start to goal, both included, or None if goal can't be reached.
+        :param start: Platform index or GROUND.
+        :param goal: Platform index or GROUND.
+        """
+        tree = self.tree(start)
+        if goal not in tree:
+            return None
+        path = [goal]
+        while path[-1] != start:
+            path.append(tree[path[-1]])
+        path.reverse()
+        return path
+
+    def moves(self, start, goal):
+        """Returns the number of moves on a shortest path from start to goal, or None if goal can't be reached."""
+        path = self.path(start, goal)
+        return None if path is None else len(path) - 1
+
+    def can_reach(self, goal, start=GROUND):
+        """
+        Whether the player can get from start onto goal.
+        :param goal: Platform index or GROUND.
+        :param start: Platform index or GROUND.
+        """
+        if start == GROUND:
+            return goal == GROUND or goal in self.reachable
+        return goal in self.tree(start)
+
+    def chest_platform(self, chest):
+        """
+        Returns the index of the platform a chest stands on, or None if it isn't on a platform.
+        :param chest: Chest rect (pygame.Rect).
+        """
+        return self.tops.get((chest.centerx, chest.bottom))
+
+    def can_reach_chest(self, chest, start=GROUND):
+        """
+        Whether the player can get from start onto the platform a chest stands on.
+        :param chest: Chest rect (pygame.Rect).
+        :param start: Platform index or GROUND.
+        """
+        platform = self.chest_platform(chest)
+        return platform is not None and self.can_reach(platform, start)
+
+
+def reachable_platforms(platforms, ladders, ground_level):
+    """
+    Returns the indices of the platforms the player can stand on, starting from the ground.
+    :param platforms: List of platform rects (pygame.Rect) sorted by x.
+    :param ladders: List of ladder rects (pygame.Rect).
+    :param ground_level: Y-coordinate of the ground.
+    """
+    return NavGraph(platforms, ladders, ground_level).reachable
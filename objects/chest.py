@@ -1,9 +1,8 @@
 import pygame
-import os
-from settings import ASSETS_PATH
+from atlas import sprite_atlas
 
 class Chest:
-    def __init__(self, platform, width, height):
+    def __init__(self, x, y, width, height):
         """
         Initializes a treasure chest with an image at the specified position.
         :param x: Horizontal position of the chest.
@@ -11,25 +10,17 @@ class Chest:
         :param width: Width of the chest (used for scaling the image).
         :param height: Height of the chest (used for scaling the image).
         """
-
-        image_path = os.path.join(ASSETS_PATH, 'images/chest.png')
-        open_image_path = os.path.join(ASSETS_PATH, 'images/chest_open.png')
-
-        self.platform = platform
-        self.rect = pygame.Rect(
-            platform.rect.centerx - (width // 2), platform.rect.top - height, 
-            width, 
-            height
-        )
-        self.image = pygame.image.load(image_path)  # Load chest image
-        self.open_image = pygame.image.load(open_image_path)  # Load opened chest image
-        self.image = pygame.transform.scale(self.image, (width, height))  # Scale chest
-        self.open_image = pygame.transform.scale(self.open_image, (width, height))  # Scale open chest
+        self.rect = pygame.Rect(x, y, width, height)
+        atlas = sprite_atlas()
+        self.sprite = atlas.sprite('images/chest.png', (width, height))  # Shared, scaled chest sprite
+        self.open_sprite = atlas.sprite('images/chest_open.png', (width, height))  # Shared, scaled open chest sprite
         self.collected = False  # Track if the chest has been opened
 
-    def draw(self, screen):
-        """Draw the chest on the screen if it hasn't been collected."""
-        if not self.collected:
-            screen.blit(self.image, self.rect)
-        else:
-            screen.blit(self.open_image, self.rect)  # Show open chest if collected
\ No newline at end of file
+    def blit_args(self, camera):
+        """Return the (source, destination, area) item drawing the chest, for use with Surface.blits."""
+        surface, area = self.open_sprite if self.collected else self.sprite  # Show open chest if collected
+        return surface, camera.apply(self.rect), area
+
+    def draw(self, screen, camera):
+        """Draw the chest on the screen and return the screen area drawn to."""
+        return screen.blit(*self.blit_args(camera))
@@ -1,24 +1,187 @@
 # Description: Defines enemy behavior and movement.
 
+import numpy as np
 import pygame
-import os
-from settings import ASSETS_PATH
+from atlas import sprite_atlas
+from profiler import profiler
+from settings import ENEMY_POOL_CAPACITY
+
+PARKED_X = np.iinfo(np.int32).max // 2  # x of unused slots, far right of anything so culling never sees them
+ENEMY_SPRITE_SIZE = (50, 50)  # Drawn from the rect's top-left corner, larger than the collision rect
+
+
+class EnemyStore:
+    """
+    Fixed-capacity pool holding every enemy as struct-of-arrays, so movement, culling and collision
+    checks run as one NumPy operation over all enemies instead of a Python loop.
+        - The arrays and one Enemy view per slot are allocated once, up front.
+        - Enemies that leave the screen free their slot, and the next spawn reuses it; nothing is
+          allocated or moved while playing, so views stay valid for as long as their enemy lives.
+        - Spawns are dropped (and counted) once every slot is in use.
+    """
+    def __init__(self, capacity=ENEMY_POOL_CAPACITY, width=20, height=20):
+        """
+        Allocates the pool.
+        :param capacity: Maximum number of enemies alive at once.
+        :param width: Collision width of every enemy.
+        :param height: Collision height of every enemy.
+        """
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.count = 0  # Slots [0, count) have been used at least once
+        self.free = []  # Freed slots below count, reused last-freed first
+        self.active = 0  # Number of living enemies
+        self.x = np.full(capacity, PARKED_X, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.prev_x = np.full(capacity, PARKED_X, dtype=np.int32)  # Position before the latest tick, used to interpolate drawing
+        self.speed = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.surface, self.area = sprite_atlas().sprite('images/enemy.png', ENEMY_SPRITE_SIZE)  # Sprite shared by every enemy
+        self.views = [Enemy(self, i) for i in range(capacity)]  # The view of every slot, handed out again and again
+
+        # Metrics
+        self.peak = 0  # Most enemies alive at once
+        self.spawned = 0  # Enemies added
+        self.recycled = 0  # Spawns that reused a freed slot
+        self.dropped = 0  # Spawns refused because the pool was full
+
+    def __len__(self):
+        return self.active
+
+    def arrays(self):
+        """Returns every per-enemy array."""
+        return (self.x, self.y, self.prev_x, self.speed, self.alive)
+
+    def add(self, x, y, speed):
+        """
+        Adds an enemy and returns its slot, or None if the pool is full.
+        :param x: Horizontal position of the enemy.
+        :param y: Vertical position of the enemy.
+        :param speed: Pixels the enemy moves left each tick.
+        """
+        if self.free:
+            i = self.free.pop()
+            self.recycled += 1
+        elif self.count < self.capacity:
+            i = self.count
+            self.count += 1
+        else:
+            self.dropped += 1
+            return None
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = y
+        self.speed[i] = speed
+        self.alive[i] = True
+        self.active += 1
+        self.spawned += 1
+        self.peak = max(self.peak, self.active)
+        return i
+
+    def move(self):
+        """Moves every enemy left by its speed (unused slots have speed 0)."""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.x[:n] -= self.speed[:n]
+
+    def cull(self, left):
+        """
+        Removes the enemies that are completely left of the given x-coordinate.
+        :param left: World x-coordinate, e.g. the left edge of the screen.
+        """
+        n = self.count
+        # Most ticks nobody leaves, which a single min() can tell
+        if self.active and self.x[:n].min() + self.width < left:
+            self.release(np.flatnonzero(self.alive[:n] & (self.x[:n] + self.width < left)))
+
+    def release(self, slots):
+        """
+        Frees the given slots for reuse.
+        :param slots: Array of slot numbers of living enemies.
+        """
+        self.alive[slots] = False
+        self.speed[slots] = 0
+        self.x[slots] = self.prev_x[slots] = PARKED_X
+        self.free.extend(slots.tolist())
+        self.active -= len(slots)
+
+    def slots(self, indices):
+        """Returns the views of the given slots."""
+        views = self.views
+        return [views[i] for i in indices]
+
+    def query(self, rect):
+        """
+        Returns the enemies whose horizontal extent overlaps the given rect.
+        :param rect: pygame.Rect to search around.
+        """
+        n = self.count
+        x = self.x[:n]
+        mask = self.alive[:n] & (x <= rect.right) & (x + self.width >= rect.left)
+        return self.slots(np.flatnonzero(mask))
+
+    def overlapping(self, rect):
+        """
+        Returns the enemies whose rect overlaps the given rect (same test as pygame.Rect.colliderect).
+        :param rect: pygame.Rect to test against.
+        """
+        if self.active == 0:
+            return []
+        # Vectorized test on x, then check y for the few enemies left
+        n = self.count
+        x = self.x[:n]
+        candidates = np.flatnonzero(self.alive[:n] & (x < rect.right) & (x > rect.left - self.width))
+        return self.slots([i for i in candidates if rect.top - self.height < self.y[i] < rect.bottom])
+
+    def stats(self):
+        """Returns the pool occupancy and allocation counters."""
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "occupancy": self.active / self.capacity,
+            "peak": self.peak,
+            "spawned": self.spawned,
+            "dropped": self.dropped,
+            "allocations_avoided": self.recycled,  # Each reused slot is an enemy that needed no new view or arrays
+        }
+
 
 class Enemy:
-    def __init__(self, start_x, start_y):
-        self.rect = pygame.Rect(start_x, start_y, 20, 20)
-        self.speed = 2  # Enemy's speed
-        self.gravity = 1  # Gravity effect
-        self.image = pygame.transform.scale(pygame.image.load(os.path.join(ASSETS_PATH, 'images/enemy.png')), (50, 50))
-
-    def update(self, scroll_x, ground_level):
-        # Move left
-        self.rect.x -= self.speed + scroll_x
+    """
+    Lightweight view of one slot of an EnemyStore. The store creates one per slot up front;
+    once the enemy is removed, the view shows whichever enemy reuses the slot.
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def rect(self):
+        store, i = self.store, self.index
+        return pygame.Rect(int(store.x[i]), int(store.y[i]), store.width, store.height)
+
+    @property
+    def speed(self):
+        return int(self.store.speed[self.index])  # Enemy's speed
+
     def check_collision(self, enemies):
                 # Check collisions with enemies
         for enemy in enemies:
             if self.rect.colliderect(enemy.rect):
-                print("Player hit by enemy!")  # Replace with damage logic or game over logic
+                profiler.count("enemy hits")  # Replace with damage logic or game over logic
+
+    def blit_args(self, camera, alpha=1.0):
+        """
+        Returns the (source, destination, area) item drawing the enemy between its previous and latest
+        position, for use with Surface.blits.
+        """
+        store = self.store
+        rect = self.rect
+        prev_x = int(store.prev_x[self.index])
+        x = round(prev_x + (rect.x - prev_x) * alpha)
+        return store.surface, camera.apply(rect.move(x - rect.x, 0)), store.area
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
+    def draw(self, screen, camera, alpha=1.0):
+        return screen.blit(*self.blit_args(camera, alpha))
@@ -1,6 +1,7 @@
 import pygame
-import os
-from settings import ASSETS_PATH
+from atlas import sprite_atlas
+
+LADDER_SPRITE_SIZE = (40, 100)  # Drawn from the rect's top-left corner, twice as wide as the rect the player climbs
 
 class Ladder:
     def __init__(self, x, y, width, height, image_path="images/ladder.png"):  # Brown color for the ladder
@@ -13,11 +14,19 @@ class Ladder:
         :param color: Color of the ladder (default is brown).
         """
         self.rect = pygame.Rect(x, y, width, height)
-        self.image = pygame.transform.scale(pygame.image.load(os.path.join(ASSETS_PATH, image_path)), (40,100))  # Scale the image to fit the ladder size
+        self.surface, self.area = sprite_atlas().sprite(image_path, LADDER_SPRITE_SIZE)  # Shared sprite, scaled to fit the ladder size
+
+    def blit_args(self, camera):
+        """
+        Returns the (source, destination, area) item drawing the ladder, for use with Surface.blits.
+        :param camera: Camera used to convert world positions to screen positions.
+        """
+        return self.surface, camera.apply(self.rect), self.area
 
-    def draw(self, screen):
+    def draw(self, screen, camera):
         """
-        Draws the ladder on the screen.
+        Draws the ladder on the screen and returns the screen area drawn to.
         :param screen: Pygame screen surface.
+        :param camera: Camera used to convert world positions to screen positions.
         """
-        screen.blit(self.image, self.rect)
+        return screen.blit(*self.blit_args(camera))
@@ -1,9 +1,83 @@
+import logging
 import random
+from profiler import profiler
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_LEVEL
 from objects.platform import Platform
-from objects.ladder import Ladder
+from objects.ladder import Ladder, LADDER_SPRITE_SIZE
 from objects.chest import Chest
-from objects.enemy import Enemy
+from objects.enemy import EnemyStore, ENEMY_SPRITE_SIZE
+from objects.spatial import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+def first_platform_rect(screen_height, rng=random):
+    """
+    Returns (x, y, width, height) of the first platform of a level.
+    :param screen_height: Height of the screen.
+    :param rng: Random number generator to use.
+    """
+    # Define ground level
+    ground_level = screen_height - 50
+
+    x = rng.randint(50, 200)  # Start near the left side
+    y = ground_level - 150  # 150 pixels above the ground
+
+    width = rng.randint(100, 200)  # Platform width
+    height = 20  # Platform height
+    return x, y, width, height
+
+
+def next_platform_rect(last_rect, screen_height, rng=random):
+    """
+    Returns (x, y, width, height) of the platform following last_rect, using the spacing rules
+    documented on PlatformManager.
+    :param last_rect: Rect of the previous platform.
+    :param screen_height: Height of the screen.
+    :param rng: Random number generator to use.
+    """
+    last_x_end = last_rect.right  # Right edge of the last platform
+    last_y = last_rect.y
+
+    # Calculate new platform position
+    x = last_x_end + rng.randint(50, 150)  # 50-150 pixels horizontally apart
+    y = last_y + rng.randint(-75, 75)  # No more than 100 pixels vertically apart
+
+    # Clamp the vertical position to screen bounds
+    y = max(50, min(y, screen_height - 150))
+
+    width = rng.randint(100, 200)
+    return x, y, width, last_rect.height
+
+
+def ladder_rects(platform_rects, ground_level, last_had_ladder=False):
+    """
+    Returns the (x, y, width, height) of the ladders for the given platforms, using the rules
+    documented on LadderManager, and whether the last platform had a ladder.
+    :param platform_rects: Rects of the platforms, in order.
+    :param ground_level: Y-coordinate of the ground.
+    :param last_had_ladder: Whether the platform before the first one had a ladder.
+    """
+    ladders = []
+    for rect in platform_rects:
+        if ground_level - rect.top > 160:
+            if not last_had_ladder:
+                ladder_x = rect.centerx - 10
+                ladder_y = rect.top
+                ladders.append((ladder_x, ladder_y, 20, 100))
+                last_had_ladder = True
+            else:
+                last_had_ladder = False
+    return ladders, last_had_ladder
+
+
+def chest_rect(platform_rect, size=75):
+    """
+    Returns the (x, y, width, height) of a chest centred on top of the platform.
+    :param platform_rect: Rect of the platform.
+    :param size: Width and height of the chest.
+    """
+    return platform_rect.centerx - size // 2, platform_rect.top - size, size, size
+
 
 class PlatformManager:
     """
@@ -17,62 +91,60 @@ class PlatformManager:
         Initializes the PlatformManager to handle multiple platforms and determine level width.
         """
         self.platforms = []
+        self.index = SpatialIndex()  # Broad-phase index for collision queries
         self.level_width = 0 
     
-    def generate_platforms(self, num_platforms, screen_height):
+    def generate_platforms(self, num_platforms, screen_height, rng=random):
         """
         Generates platforms and calculates the level width based on the rightmost platform.
+        :param num_platforms: Number of platforms to generate.
+        :param screen_height: Height of the screen.
+        :param rng: Random number generator to use (e.g. a seeded random.Random).
         """
-        # Define ground level
-        ground_level = screen_height - 50
-
         # First platform: Fixed height, slightly above the ground
-        x = random.randint(50, 200)  # Start near the left side
-        y = ground_level - 150  # 150 pixels above the ground
-
-        width = random.randint(100, 200)  # Platform width
-        height = 20  # Platform height
-
-        self.platforms.append(Platform(x, y, width, height))
+        self.platforms.append(Platform(*first_platform_rect(screen_height, rng)))
 
         # Generate subsequent platforms
         for i in range(num_platforms - 1):
-            # Get the last platform's position and size
-            last_platform = self.platforms[-1]
-            last_x_end = last_platform.rect.right  # Right edge of the last platform
-            last_y = last_platform.rect.y
-
-            # Calculate new platform position
-            x = last_x_end + random.randint(50, 150)  # 50-150 pixels horizontally apart
-            y = last_y + random.randint(-75, 75)  # No more than 100 pixels vertically apart
-
-            # Clamp the vertical position to screen bounds
-            y = max(50, min(y, screen_height - 150))
-
-            # Create and add the platform
-            width = random.randint(100, 200)
-            platform = Platform(x, y, width, height)
-            self.platforms.append(platform)
+            rect = next_platform_rect(self.platforms[-1].rect, screen_height, rng)
+            self.platforms.append(Platform(*rect))
         
         # Update level width based on the rightmost platform
         self.level_width = self.platforms[-1].rect.right
-        print(f"Level width: {self.level_width}")
-    
-    def update(self, scroll_x):
+        self.index.rebuild(self.platforms)
+        logger.debug("Level width: %d", self.level_width)
+
+    def add(self, platform):
+        """
+        Adds a single platform, e.g. one loaded from a level file.
+        :param platform: Platform to add.
+        """
+        self.platforms.append(platform)
+        self.index.insert(platform)
+
+    def remove(self, platform):
+        """
+        Removes a platform that is no longer needed, e.g. one far behind the camera.
+        :param platform: Platform to remove.
+        """
+        self.platforms.remove(platform)
+        self.index.remove(platform)
+
+    def nearby(self, rect):
         """
-        Updates platform positions based on player's movement for scrolling.
-        :param scroll_x: Horizontal scroll amount.
+        Returns the platforms that horizontally overlap the given rect.
+        :param rect: pygame.Rect to search around (e.g. the player's rect).
         """
-        for platform in self.platforms:
-            platform.rect.x -= scroll_x
+        return self.index.query(rect)
 
-    def draw(self, screen):
+    def draw(self, screen, camera):
         """
-        Draws all platforms managed by the PlatformManager.
+        Draws the platforms that are on screen and returns the screen areas drawn to.
         :param screen: Pygame screen surface.
+        :param camera: Camera used to cull off-screen platforms and convert world positions to screen positions.
         """
-        for platform in self.platforms:
-            platform.draw(screen)
+        # Platforms are pre-rendered, so the whole layer is one batched blit
+        return screen.blits([platform.blit_args(camera) for platform in camera.visible(self.index)])
 
 class LadderManager:
     """
@@ -85,94 +157,114 @@ class LadderManager:
 
         """
         self.ladders = []
+        self.index = SpatialIndex()  # Broad-phase index for collision queries
     
     def place_ladders(self, platforms, ground_level):
-        last_had_ladder = False # Track last platform with a ladder
-
-        for platform in platforms:
-            if ground_level - platform.rect.top > 160:
-                if not last_had_ladder:
-                    ladder_x = platform.rect.centerx - 10
-                    ladder_y = platform.rect.top
-                    self.ladders.append(Ladder(ladder_x, ladder_y, 20, 100))
-                    last_had_ladder = True
-                else:
-                    last_had_ladder = False
-
-    def update(self, scroll_x):
-        for ladder in self.ladders:
-            ladder.rect.x -= scroll_x
-
-    def draw(self, screen):
-        for ladder in self.ladders:
-            ladder.draw(screen)
+        rects, last_had_ladder = ladder_rects([platform.rect for platform in platforms], ground_level)
+        for rect in rects:
+            self.ladders.append(Ladder(*rect))
+        self.index.rebuild(self.ladders)
+
+    def add(self, ladder):
+        self.ladders.append(ladder)
+        self.index.insert(ladder)
+
+    def remove(self, ladder):
+        self.ladders.remove(ladder)
+        self.index.remove(ladder)
+
+    def nearby(self, rect):
+        return self.index.query(rect)
+
+    def draw(self, screen, camera):
+        # One batched blit for the whole layer; every ladder comes from the same atlas surface
+        return screen.blits([ladder.blit_args(camera)
+                             for ladder in camera.visible(self.index, LADDER_SPRITE_SIZE[0])])
 
 class ChestManager:
     def __init__(self):
         self.chests = []
+        self.index = SpatialIndex()  # Broad-phase index for collision queries
 
-    def place_chests(self, platforms):
+    def place_chests(self, platforms, rng=random):
         eligible_platforms = [p for p in platforms if p.rect.bottom > 160] 
-        chest_platforms = random.sample(eligible_platforms, min(7, len(eligible_platforms)))
+        chest_platforms = rng.sample(eligible_platforms, min(7, len(eligible_platforms)))
         
         for platform in chest_platforms:
-            self.chests.append(Chest(platform, 75, 75))
-    
-    def update(self, scroll_x):
-        for chest in self.chests:
-            chest.rect.x -= scroll_x
+            self.chests.append(Chest(*chest_rect(platform.rect)))
+        self.index.rebuild(self.chests)
+
+    def add(self, chest):
+        self.chests.append(chest)
+        self.index.insert(chest)
+
+    def remove(self, chest):
+        self.chests.remove(chest)
+        self.index.remove(chest)
+
+    def nearby(self, rect):
+        return self.index.query(rect)
     
-    def draw(self, screen):
-        for chest in self.chests:
-            chest.draw(screen)
+    def draw(self, screen, camera):
+        return screen.blits([chest.blit_args(camera) for chest in camera.visible(self.index)])
 
 class EnemyManager:
     """
     Handles the generation, updating, and rendering of enemies in the game.
+    Enemies live in an EnemyStore, so each update is a few vectorized passes over all of them,
+    and spawning reuses the slot of an enemy that left the screen instead of allocating.
     """
     def __init__(self):
         """
-        Initializes the EnemyManager to manage a list of enemies and control spawn timing.
+        Initializes the EnemyManager to manage the enemy store and control spawn timing.
         """
-        self.enemies = []
+        self.store = EnemyStore()
         self.last_spawn_time = 0  # Time when the last enemy was spawned
 
-    def generate_enemies(self, screen_width, ground_level):
+    def generate_enemies(self, camera, ground_level):
         """
-        Generates a single enemy at a random position on the screen.
-        :param screen_width: Width of the game screen.
+        Generates a single enemy just off the right edge of the screen.
+        :param camera: Camera showing the visible part of the level.
         :param ground_level: Y-coordinate of the ground.
         """
-        x = screen_width + 50  # Spawn just off the right edge of the screen
+        x = camera.view.right + 50  # Spawn just off the right edge of the screen
         y = ground_level - 50  # Ground level
-        self.enemies.append(Enemy(x, y))
-        print(f"Generated Enemy at ({x}, {y})")  # Debug
+        if self.store.add(x, y, 2) is None:  # Enemies move left 2 pixels per tick
+            profiler.count("enemies dropped")
+            logger.warning("Enemy pool full, no enemy spawned at (%d, %d)", x, y)
+            return
+        profiler.count("enemies spawned")
+        logger.debug("Generated enemy at (%d, %d)", x, y)
 
-    def update(self, current_time, screen_width, scroll_x, ground_level):
+    def update(self, current_time, camera, ground_level):
         """
         Updates the positions and behavior of all enemies and spawns new ones every 10 seconds.
         :param current_time: Current game time in milliseconds.
-        :param screen_width: Width of the screen (used for spawning).
-        :param scroll_x: Horizontal scrolling value to move enemies.
+        :param camera: Camera showing the visible part of the level (used for spawning and removal).
         :param ground_level: Y-coordinate of the ground.
         """
         # Spawn a new enemy every 10 seconds
         if current_time - self.last_spawn_time > 10000:  # 10 seconds = 10000 ms
-            self.generate_enemies(screen_width, ground_level)
+            self.generate_enemies(camera, ground_level)
             self.last_spawn_time = current_time  # Reset spawn time
 
-        # Update all enemies
-        for enemy in self.enemies[:]:
-            enemy.update(scroll_x, ground_level)
+        # Move all enemies, then remove those that moved off the left edge of the screen
+        self.store.move()
+        self.store.cull(camera.x)
 
-            # Remove enemies that move off-screen
-            if enemy.rect.right < 0:
-                self.enemies.remove(enemy)
+    def colliding(self, rect):
+        """
+        Returns the enemies overlapping the given rect.
+        :param rect: pygame.Rect to test against (e.g. the player's rect).
+        """
+        return self.store.overlapping(rect)
 
-    def draw(self, screen):
+    def draw(self, screen, camera, alpha=1.0):
         """
-        Draws all enemies on the screen.
+        Draws the enemies that are on screen with one Surface.blits call and returns the screen areas drawn to.
         :param screen: Pygame screen surface.
+        :param camera: Camera used to cull off-screen enemies and convert world positions to screen positions.
+        :param alpha: How far (0-1) to interpolate from the previous tick to the latest one.
         """
-        for enemy in self.enemies:
-            enemy.draw(screen)
+        return screen.blits([enemy.blit_args(camera, alpha)
+                             for enemy in camera.visible(self.store, ENEMY_SPRITE_SIZE[0])])
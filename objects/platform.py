@@ -1,8 +1,67 @@
+from collections import OrderedDict
+
 import pygame
-from settings import YELLOW
+from assets import load_image
+from display import scaled_size
+from settings import YELLOW, PLATFORM_TEXTURE, PLATFORM_CACHE_SIZE, RENDER_SCALE
+
+
+class PlatformSurfaces:
+    """
+    Pre-rendered platform surfaces, so drawing a platform is a blit instead of rasterizing a rect every frame.
+        - Surfaces are keyed by (width, height, color, texture) and shared by every platform with that look.
+        - They are rendered at the render target's scale (see display.py), so drawing never scales.
+        - The least recently used surface is evicted once the cache is full.
+    """
+    def __init__(self, max_entries=PLATFORM_CACHE_SIZE, scale=RENDER_SCALE):
+        """
+        Initializes an empty cache.
+        :param max_entries: Maximum number of platform surfaces kept in memory.
+        :param scale: Size of the render target relative to the screen size.
+        """
+        self.max_entries = max_entries
+        self.scale = scale
+        self.entries = OrderedDict()  # (width, height, color, texture) -> surface
+
+    def surface(self, width, height, color, texture=None):
+        """
+        Returns the surface of a platform.
+        :param width: Width of the platform in screen pixels.
+        :param height: Height of the platform in screen pixels.
+        :param color: Fill color.
+        :param texture: Path of an image (relative to the assets folder) tiled over the fill, or None for a plain fill.
+        """
+        key = (width, height, tuple(color), texture)
+        surface = self.entries.get(key)
+        if surface is None:
+            size = scaled_size((width, height), self.scale)
+            surface = pygame.Surface(size)
+            surface.fill(color)
+            if texture:
+                tile = load_image(texture)
+                tile = load_image(texture, scaled_size(tile.get_size(), self.scale))
+                for x in range(0, size[0], tile.get_width()):
+                    surface.blit(tile, (x, 0))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            self.entries[key] = surface
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return surface
+
+
+# Shared cache used by every platform
+platform_surfaces = PlatformSurfaces()
+
 
 class Platform:
-    def __init__(self, x, y, width, height, color=YELLOW):
+    """
+    A platform the player can stand on. rect is its only geometry: it is drawn at rect,
+    and the player lands on rect's top edge (see first_landing in player.py).
+    """
+    def __init__(self, x, y, width, height, color=YELLOW, texture=PLATFORM_TEXTURE):
         """
         Initializes a platform at the specified position with the given dimensions and color.
         :param x: Horizontal position of the platform.
@@ -10,14 +69,23 @@ class Platform:
         :param width: Width of the platform.
         :param height: Height of the platform.
         :param color: Color of the platform (default is yellow).
+        :param texture: Image tiled over the platform (default from settings, None for a plain color).
         """
         self.rect = pygame.Rect(x, y, width, height)
-        self.collision_rect = self.rect.inflate(0, -height * 0.1)  # Adjust collision area
         self.color = color
+        self.surface = platform_surfaces.surface(width, height, color, texture)  # Shared with same-sized platforms
+
+    def blit_args(self, camera):
+        """
+        Returns the (source, destination) item drawing the platform, for use with Surface.blits.
+        :param camera: Camera used to convert world positions to screen positions.
+        """
+        return self.surface, camera.apply(self.rect)
 
-    def draw(self, screen):
+    def draw(self, screen, camera):
         """
-        Draws the platform on the screen.
+        Draws the platform on the screen and returns the screen area drawn to.
         :param screen: Pygame screen surface.
+        :param camera: Camera used to convert world positions to screen positions.
         """
-        pygame.draw.rect(screen, self.color, self.rect)
\ No newline at end of file
+        return screen.blit(*self.blit_args(camera))
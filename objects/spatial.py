@@ -0,0 +1,63 @@
+# Description: Broad-phase spatial index used for collision queries.
+from bisect import bisect_left, bisect_right
+
+
+class SpatialIndex:
+    """
+    Sweep-and-prune index that keeps objects sorted by the left edge of their rect.
+        - Queries bisect into the sorted edges, so only objects near the query range are checked.
+        - Rects are in world coordinates, so static objects never need to be re-sorted.
+    """
+    def __init__(self, items=()):
+        """
+        Initializes the index with the given objects.
+        :param items: Objects with a pygame.Rect stored in their rect attribute.
+        """
+        self.items = []
+        self.lefts = []
+        self.max_width = 0  # Widest indexed rect, bounds how far left a query has to look
+        self.rebuild(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def rebuild(self, items):
+        """
+        Replaces the contents of the index, e.g. after objects moved independently.
+        :param items: Objects with a pygame.Rect stored in their rect attribute.
+        """
+        self.items = sorted(items, key=lambda item: item.rect.left)
+        self.lefts = [item.rect.left for item in self.items]
+        self.max_width = max((item.rect.width for item in self.items), default=0)
+
+    def insert(self, item):
+        """
+        Adds an object, keeping the index sorted.
+        :param item: Object with a pygame.Rect stored in its rect attribute.
+        """
+        left = item.rect.left
+        i = bisect_right(self.lefts, left)
+        self.lefts.insert(i, left)
+        self.items.insert(i, item)
+        self.max_width = max(self.max_width, item.rect.width)
+
+    def remove(self, item):
+        """
+        Removes an object from the index.
+        :param item: Object previously added to the index.
+        """
+        left = item.rect.left
+        i = bisect_left(self.lefts, left)
+        while self.items[i] is not item:
+            i += 1
+        del self.lefts[i]
+        del self.items[i]
+
+    def query(self, rect):
+        """
+        Returns the objects whose horizontal extent overlaps the given rect, sorted by left edge.
+        :param rect: pygame.Rect to search around.
+        """
+        lo = bisect_left(self.lefts, rect.left - self.max_width)
+        hi = bisect_right(self.lefts, rect.right)
+        return [item for item in self.items[lo:hi] if item.rect.right >= rect.left]
@@ -1,8 +1,33 @@
 ## Description: Defines player behavior and button clicks.
 
+import logging
+
 import pygame
+from actions import LEFT, RIGHT, JUMP, UP, DOWN, OPEN
+from atlas import sprite_atlas
+from profiler import profiler
 from settings import *
 
+logger = logging.getLogger(__name__)
+
+
+def first_landing(platforms, x, start, end):
+    """
+    Swept test of a point moving straight down from y=start to y=end against the platforms' top edges.
+    Returns the platform hit first (the one with the earliest time of impact, i.e. the highest top
+    in the range), or None if the point crosses none.
+    :param platforms: Candidate Platform objects.
+    :param x: X-coordinate of the point.
+    :param start: Y-coordinate the point moves from.
+    :param end: Y-coordinate the point moves to.
+    """
+    hit = None
+    for platform in platforms:
+        rect = platform.rect
+        if rect.left <= x <= rect.right and start <= rect.top <= end and (hit is None or rect.top < hit.rect.top):
+            hit = platform
+    return hit
+
 
 class Player:
     def __init__(self):
@@ -15,106 +40,91 @@ class Player:
         self.is_falling = False
         self.on_platform = False
         self.is_dropping = False
-        self.jump_animation_timer = 0
-        self.scroll_x = 0 # Track horizontal scrolling
-        self.scroll_speed = 3 # Speed of scrolling
-        self.scroll_offset = 0
-
-        # Load images of player
-        self.image_idle = pygame.image.load("assets/images/fairy.png")
-        self.image_jump = pygame.image.load("assets/images/fairy_jump.png")
-        
-        # Ensure the images are the same size
-        self.image_idle = pygame.transform.scale(self.image_idle, (100,100))
-        self.image_jump = pygame.transform.scale(self.image_jump, (100,100))
- 
-        # Start with the idle image
-        self.image = self.image_idle 
-        self.rect = self.image.get_rect(midbottom=(SCREEN_WIDTH // 2, GROUND_LEVEL)) # Position image
+        self.jump_animation_timer = 0  # Ticks left to show the jump sprite
+
+        # (surface, area) of the player sprites in the texture atlas (scaled to the same size, shared between restarts)
+        atlas = sprite_atlas()
+        self.sprite_idle = atlas.sprite("images/fairy.png", (100, 100))
+        self.sprite_jump = atlas.sprite("images/fairy_jump.png", (100, 100))
+
+        # Start with the idle sprite
+        self.sprite = self.sprite_idle
+        self.rect = pygame.Rect(0, 0, 100, 100)
+        self.rect.midbottom = (SCREEN_WIDTH // 2, GROUND_LEVEL)  # Position of the sprite (world coordinates)
+        self.prev_pos = self.rect.topleft  # Position before the latest tick, used to interpolate drawing
         
 
-    def check_platform_collisions(self, platforms):
+    def check_platform_collisions(self, platforms, dy):
         """
-        Checks if the player's horizontal midpoint aligns with a platform's bounds and ensures
-        the player snaps to the highest valid platform.
-        :param platforms: List of Platform objects.
+        Moves the player dy pixels vertically and lands them on the first platform their feet
+        (the midpoint of the bottom edge) cross on the way down. The whole move is tested at once,
+        so the player can't pass through a platform however fast they fall.
+        Platforms are one-way: they are jumped through from below and dropped through while dropping.
+        :param platforms: Candidate Platform objects (e.g. from PlatformManager.nearby).
+        :param dy: Vertical distance to move this tick (positive is down).
         """
+        start = self.rect.bottom
+        self.rect.y += dy
 
-        for platform in platforms:
-            # Ignore platform collisions if dropping
-            if self.is_dropping:
-                continue
-            
-            # Horizontal midpoint of the player
-            player_mid_x = self.rect.centerx
-
-            # Horizontal condition: Player's midpoint must be over the platform
-            is_midpoint_on_platform = platform.rect.left <= player_mid_x <= platform.rect.right
-
-            # Vertical condition: Player's bottom is near the platform's top while falling
-            is_falling_onto_platform = (
-                self.rect.bottom >= platform.rect.top - 30 and  # Fairy's bottom reaches the platform
-                self.rect.bottom <= platform.rect.top + 50 and  # Allow small buffer for snapping
-                self.vel_y > 0  # Fairy is falling
-            )
-
-            # Both conditions must be met to land
-            if is_midpoint_on_platform and is_falling_onto_platform:
-                # Snap the player's bottom to the top of the platform
-                self.rect.bottom = platform.rect.top
-                self.vel_y = 0  # Stop vertical movement
-                self.is_jumping = False  # Allow jumping again
-                self.is_falling = False  # Stop falling
-                self.on_platform = True  # Mark the player as on a platform
-                return True  # Collision detected, stop further checks
-        return False
+        # Ignore platform collisions if dropping or not falling
+        if self.is_dropping or self.vel_y <= 0:
+            return False
+
+        platform = first_landing(platforms, self.rect.centerx, start, self.rect.bottom)
+        if platform is None:
+            return False
+
+        # Snap the player's bottom to the top of the platform
+        self.rect.bottom = platform.rect.top
+        self.vel_y = 0  # Stop vertical movement
+        self.is_jumping = False  # Allow jumping again
+        self.is_falling = False  # Stop falling
+        self.on_platform = True  # Mark the player as on a platform
+        return True
 
     
-    def update(self, platforms, ladders, chests, enemies, level_width):
+    def update(self, actions, platform_manager, ladder_manager, chest_manager, enemy_manager):
         """
-        Updates the player's position and handles collisions with platforms.
-        :param platforms: List of Platform objects.
+        Updates the player's position by one tick and handles collisions with platforms.
+        Only objects near the player are checked, using each manager's spatial index.
+        :param actions: Bitmask of the actions held this tick (see actions.py).
+        :param platform_manager: PlatformManager holding the level's platforms.
+        :param ladder_manager: LadderManager holding the level's ladders.
+        :param chest_manager: ChestManager holding the level's chests.
+        :param enemy_manager: EnemyManager holding the active enemies.
         """
-        keys = pygame.key.get_pressed()
-
-        # Horizontal movement
-        if keys[pygame.K_LEFT]:
-            if self.rect.x > SCREEN_WIDTH // 4 or self.scroll_x <= 0:
-                self.vel_x = -PLAYER_SPEED
-            else:
-                self.scroll_x = max(self.scroll_x - self.scroll_speed, 0)  # Allow negative scrolling
-        elif keys[pygame.K_RIGHT]:
-            if self.rect.x < 2 * SCREEN_WIDTH // 4 or self.scroll_x + SCREEN_WIDTH >= level_width:
-                self.vel_x = PLAYER_SPEED
-            else:
-                self.vel_x = 0
-                self.scroll_x = min(self.scroll_x + self.scroll_speed, level_width - SCREEN_WIDTH)  # Scroll right
+        level_width = max(platform_manager.level_width, SCREEN_WIDTH)
+        self.prev_pos = self.rect.topleft
+
+        # Horizontal movement (the camera follows the player, see Camera.follow)
+        if actions & LEFT:
+            self.vel_x = -PLAYER_SPEED
+        elif actions & RIGHT:
+            self.vel_x = PLAYER_SPEED
         else:
             self.vel_x = 0
-        
-        self.scroll_x = max(0, min(self.scroll_x, level_width - SCREEN_WIDTH))
 
         # Jumping
-        if keys[pygame.K_SPACE] and not self.is_jumping and not self.is_falling:
+        if actions & JUMP and not self.is_jumping and not self.is_falling:
             self.vel_y = -PLAYER_JUMP_POWER  # Vertical velocity for the jump
-            self.vel_x = PLAYER_JUMP_FORWARD_SPEED if keys[pygame.K_RIGHT] else (
-                -PLAYER_JUMP_FORWARD_SPEED if keys[pygame.K_LEFT] else 0
+            self.vel_x = PLAYER_JUMP_FORWARD_SPEED if actions & RIGHT else (
+                -PLAYER_JUMP_FORWARD_SPEED if actions & LEFT else 0
             )  # Add forward or backward velocity during jump
             self.is_jumping = True
             self.on_platform = False
 
             # Jump animation
-            self.image = self.image_jump  # Switch to jump sprite
-            self.jump_animation_timer = pygame.time.get_ticks()  # Start animation timer
+            self.sprite = self.sprite_jump  # Switch to jump sprite
+            self.jump_animation_timer = JUMP_ANIMATION_TICKS  # Start animation timer
 
         # Dropping through a platform
-        if keys[pygame.K_DOWN]:
+        if actions & DOWN:
             self.is_dropping = True  # Enable drop-through state
 
         # Climbing ladders
         self.on_ladder = False
-        for ladder in ladders:
-            if self.rect.colliderect(ladder.rect) and keys[pygame.K_UP]:
+        for ladder in ladder_manager.nearby(self.rect):
+            if self.rect.colliderect(ladder.rect) and actions & UP:
                 self.vel_y = -PLAYER_CLIMB_SPEED  # Move upward at climbing speed
                 self.on_ladder = True
                 break
@@ -122,45 +132,36 @@ class Player:
                 self.on_ladder = False  # Reset if not on a ladder
 
         # Opening chests
-        for chest in chests:
+        for chest in chest_manager.nearby(self.rect):
             if self.rect.colliderect(chest.rect) and not chest.collected:
                 # Handle chest interaction (e.g., key press)
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_e]:  # Press 'E' to open the chest
+                if actions & OPEN:  # Press 'E' to open the chest
                     chest.collected = True  # Mark chest as opened
                     self.score += 10  # Increase the player's score
-                    print(f"Chest opened! Score: {self.score}")
-
-        for enemy in enemies:
-            if self.rect.colliderect(enemy.rect):
-                print("Player hit by enemy!")  # Replace with damage logic or game over logic
-        # Apply gravity only if not climbing
-        if not self.on_ladder:
-            self.vel_y += GRAVITY
-
-        # Update vertical position
-        self.rect.y += self.vel_y
-
-        # Prevent falling below the screen
-        if self.rect.bottom > SCREEN_HEIGHT:
-            self.rect.bottom = SCREEN_HEIGHT
-            self.vel_y = 0
-
-        # Apply gravity only if not on platform
-        if not self.on_platform or self.is_dropping:
-            self.vel_y += GRAVITY
-            if self.vel_y > 0:
-                self.is_falling = True
-
-        # Update vertical position
-        self.rect.y += self.vel_y
-
-        # Check for platform collisions
-        if not self.is_dropping and self.check_platform_collisions(platforms):
-            self.is_falling = False
-        else:
+                    profiler.count("chests opened")
+                    logger.info("Chest opened! Score: %d", self.score)
+
+        for enemy in enemy_manager.colliding(self.rect):
+            profiler.count("enemy hits")  # Replace with damage logic or game over logic
+        # Gravity is applied in two half-steps per tick: the first unless climbing, the second only
+        # in the air. The velocity after the first half-step is used for both halves of the move,
+        # which gives the jump arc navigation.py works with; the tick's move is then made in one step.
+        gravity = 0 if self.on_ladder else GRAVITY
+        air_gravity = GRAVITY if not self.on_platform or self.is_dropping else 0
+        dy = 2 * (self.vel_y + gravity) + air_gravity
+        self.vel_y += gravity + air_gravity
+        if air_gravity and self.vel_y > 0:
+            self.is_falling = True
+
+        # Move vertically, landing on any platform crossed on the way down
+        if not self.check_platform_collisions(platform_manager.nearby(self.rect), dy):
             self.on_platform = False
 
+        # The top of the screen is the only ceiling
+        if self.rect.top < 0:
+            self.rect.top = 0
+            self.vel_y = max(self.vel_y, 0)
+
         # Collision with ground
         if self.rect.bottom > GROUND_LEVEL:
             self.rect.bottom = GROUND_LEVEL
@@ -174,17 +175,21 @@ class Player:
         if not self.on_platform and self.rect.bottom < SCREEN_HEIGHT - 50:
             self.is_jumping = True  # Allow jumping again while falling
             
-        # Update horizontal position
+        # Update horizontal position, staying inside the level
         self.rect.x += self.vel_x
-        self.rect.x = max(0, min(self.rect.x, SCREEN_WIDTH - self.rect.width))
+        self.rect.x = max(0, min(self.rect.x, level_width - self.rect.width))
 
         # Jump animation duration
-        if self.image == self.image_jump:
-            if pygame.time.get_ticks() - self.jump_animation_timer > 200:  # 200ms duration
-                self.image = self.image_idle
+        if self.sprite is self.sprite_jump:
+            self.jump_animation_timer -= 1
+            if self.jump_animation_timer < 0:
+                self.sprite = self.sprite_idle
 
 
 
-    def draw(self, screen):
-        # Draw the player sprite
-        screen.blit(self.image, self.rect)
+    def draw(self, screen, camera, alpha=1.0):
+        # Draw the player sprite between its previous and latest position and return the area drawn to
+        x = self.prev_pos[0] + (self.rect.x - self.prev_pos[0]) * alpha
+        y = self.prev_pos[1] + (self.rect.y - self.prev_pos[1]) * alpha
+        surface, area = self.sprite
+        return screen.blit(surface, camera.apply(self.rect.move(round(x) - self.rect.x, round(y) - self.rect.y)), area)
@@ -0,0 +1,266 @@
+# Description: This file contains the frame profiler: named timing scopes, event counters, rolling frame time
+# percentiles, an in-game overlay and CSV/JSON session traces.
+import csv
+import json
+import logging
+import time
+from collections import deque
+
+import pygame
+from hud import text_cache
+from settings import PROFILE_WINDOW, PROFILE_TRACE_FRAMES
+
+logger = logging.getLogger(__name__)
+
+
+class Scope:
+    """
+    Context manager that adds the time spent inside it to the current frame's total for its name.
+    """
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        totals = self.totals
+        totals[self.name] = totals.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class NullScope:
+    """Scope used while the profiler is disabled; does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_SCOPE = NullScope()
+
+
+class Profiler:
+    """
+    Collects per-frame timings of named scopes.
+        - Wrap a section in `with profiler.scope("name"):`; a scope entered several times in one
+          frame (e.g. once per simulation tick) adds up.
+        - sample() records a per-frame value (e.g. objects drawn) in the current frame, next to the timings.
+        - end_frame() stores the frame in a rolling window for the percentiles and the overlay,
+          and in the session trace that export() writes.
+        - While disabled, scope() returns a shared no-op scope, so headless runs pay almost nothing.
+    """
+    def __init__(self, window=PROFILE_WINDOW, trace_frames=PROFILE_TRACE_FRAMES, enabled=False):
+        """
+        :param window: Number of recent frames used for the percentiles.
+        :param trace_frames: Maximum number of frames kept for export (the oldest are dropped).
+        :param enabled: Whether scopes are timed.
+        """
+        self.enabled = enabled
+        self.frames = deque(maxlen=window)  # Recent frame records
+        self.trace = deque(maxlen=trace_frames)  # Frame records of the session
+        self.names = []  # Scope names in the order they were first seen
+        self.sample_names = []  # Per-frame value names in the order they were first seen
+        self.counters = {}  # Event name -> count for the session
+        self.totals = {}  # Scope name -> seconds spent in the current frame
+        self.samples = {}  # Per-frame value name -> value in the current frame
+        self.scopes = {}  # Scope name -> reusable Scope
+        self.frame = 0
+        self.frame_start = None
+        self.last_frame_end = None
+
+    def reset(self):
+        """Starts a new session, clearing the recorded frames and counters."""
+        self.frames.clear()
+        self.trace.clear()
+        self.names = []
+        self.sample_names = []
+        self.counters = {}
+        self.totals.clear()  # Cleared in place, the cached scopes add to this dict
+        self.samples.clear()
+        self.frame = 0
+        self.frame_start = self.last_frame_end = None
+
+    def scope(self, name):
+        """
+        Returns a context manager timing the code inside it under the given name.
+        :param name: Name of the scope (e.g. "player" or "draw platforms").
+        """
+        if not self.enabled:
+            return NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = Scope(self.totals, name)
+        return scope
+
+    def count(self, name, amount=1):
+        """
+        Adds to an event counter (e.g. chests opened or enemy hits).
+        :param name: Name of the counter.
+        :param amount: Amount to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def sample(self, name, value):
+        """
+        Records a value of the current frame (e.g. objects drawn), stored in the frame record by end_frame.
+        :param name: Name of the value.
+        :param value: Value for this frame.
+        """
+        if self.enabled:
+            self.samples[name] = value
+
+    def begin_frame(self):
+        """Marks the start of a frame's work."""
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Records the scope totals of the frame that just finished."""
+        if not self.enabled or self.frame_start is None:
+            return
+        now = time.perf_counter()
+        record = {"frame": self.frame, "work": (now - self.frame_start) * 1000}
+        # Time from the end of the previous frame to the end of this one, including the wait for the next frame
+        record["interval"] = (now - self.last_frame_end) * 1000 if self.last_frame_end is not None else record["work"]
+        for name, seconds in self.totals.items():
+            if name not in record:
+                if name not in self.names:
+                    self.names.append(name)
+                record[name] = seconds * 1000
+        self.totals.clear()
+        for name, value in self.samples.items():
+            if name not in record:
+                if name not in self.sample_names:
+                    self.sample_names.append(name)
+                record[name] = value
+        self.samples.clear()
+
+        self.frames.append(record)
+        self.trace.append(record)
+        self.frame += 1
+        self.last_frame_end = now
+
+    def percentiles(self, name="interval", points=(50, 95, 99), records=None):
+        """
+        Returns the given percentiles (in ms) of a timing over the recent frames, or None if nothing was recorded.
+        :param name: "interval" (frame to frame), "work" (time spent on the frame) or a scope name.
+        :param points: Percentiles to compute.
+        :param records: Frame records to use instead of the recent frames, e.g. the session trace.
+        """
+        values = sorted(record.get(name, 0.0) for record in (self.frames if records is None else records))
+        if not values:
+            return None
+        return [values[min(len(values) - 1, len(values) * point // 100)] for point in points]
+
+    def mean(self, name):
+        """Returns the mean time (in ms) of a timing, or the mean of a per-frame value, over the recent frames."""
+        if not self.frames:
+            return 0.0
+        return sum(record.get(name, 0.0) for record in self.frames) / len(self.frames)
+
+    def summary(self):
+        """Returns the number of frames, the frame time percentiles over the session trace and the counters."""
+        return {
+            "frames": len(self.trace),
+            "interval_ms": self.percentiles("interval", records=self.trace),
+            "work_ms": self.percentiles("work", records=self.trace),
+            "counters": dict(self.counters),
+        }
+
+    def export(self, path):
+        """
+        Writes the session trace to path: a CSV with one row per frame if it ends in .csv,
+        otherwise JSON with the frames, the counters and the frame time percentiles.
+        :param path: File to write to.
+        """
+        columns = ["frame", "interval", "work"] + self.names + self.sample_names
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as file:
+                writer = csv.DictWriter(file, columns, restval=0.0)
+                writer.writeheader()
+                writer.writerows(self.trace)
+        else:
+            with open(path, "w") as file:
+                json.dump({
+                    "columns": columns,
+                    "frames": [[record.get(column, 0.0) for column in columns] for record in self.trace],
+                    "counters": self.counters,
+                    "percentiles": {name: self.percentiles(name) for name in ("interval", "work")},
+                }, file)
+        logger.info("Wrote profile of %d frames to %s", len(self.trace), path)
+
+
+class ProfilerOverlay:
+    """
+    Panel in the top-right corner showing the frame time percentiles, the mean time of every scope,
+    the mean of every per-frame value and the counters. The text is only re-rendered a few times per second.
+    """
+    def __init__(self, profiler, refresh_frames=15):
+        """
+        :param profiler: Profiler to show.
+        :param refresh_frames: Number of frames between text updates.
+        """
+        self.profiler = profiler
+        self.refresh_frames = refresh_frames
+        self.visible = False
+        self.panel = None
+        self.age = 0
+
+    def toggle(self):
+        """Shows or hides the overlay."""
+        self.visible = not self.visible
+        self.panel = None
+
+    def lines(self):
+        """Returns the text lines of the panel."""
+        profiler = self.profiler
+        lines = []
+        for name in ("interval", "work"):
+            p50, p95, p99 = profiler.percentiles(name) or (0.0, 0.0, 0.0)
+            lines.append(f"{name:<16} p50 {p50:5.1f}  p95 {p95:5.1f}  p99 {p99:5.1f} ms")
+        for name in profiler.names:
+            lines.append(f"{name:<16} {profiler.mean(name):6.2f} ms")
+        for name in profiler.sample_names:
+            lines.append(f"{name:<16} {profiler.mean(name):6.1f} per frame")
+        for name, count in sorted(profiler.counters.items()):
+            lines.append(f"{name:<16} {count}")
+        return lines
+
+    def render(self):
+        """Renders the panel surface."""
+        font = text_cache.font(20)
+        texts = [font.render(line, True, (255, 255, 255)) for line in self.lines()]  # Changing text, so not cached
+        width = max(text.get_width() for text in texts) + 10
+        height = sum(text.get_height() for text in texts) + 10
+        panel = pygame.Surface((width, height))
+        panel.fill((0, 0, 0))
+        y = 5
+        for text in texts:
+            panel.blit(text, (5, y))
+            y += text.get_height()
+        return panel
+
+    def draw(self, screen):
+        """
+        Draws the panel if it is visible. Returns the screen areas drawn to.
+        :param screen: Pygame screen surface.
+        """
+        if not self.visible:
+            return []
+        self.age += 1
+        if self.panel is None or self.age >= self.refresh_frames:
+            self.panel = self.render()
+            self.age = 0
+        return [screen.blit(self.panel, (screen.get_width() - self.panel.get_width() - 10, 10))]
+
+
+# Shared profiler; disabled until the game enables it
+profiler = Profiler()
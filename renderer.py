@@ -0,0 +1,50 @@
+# Description: This file contains the renderer that only redraws the parts of the screen that changed.
+from display import target
+
+
+class Renderer:
+    """
+    Dirty-rect renderer for the game screen:
+        - Sprites drawn last frame are erased by copying the cached static layer back over them.
+        - The cloud area is redrawn every frame since the clouds always move.
+        - Only the erased areas and the newly drawn areas are sent to the display (see RenderTarget.present).
+        - All areas are in render target pixels.
+    """
+    def __init__(self, background_manager):
+        """
+        Initializes the renderer. The first frame is always drawn in full.
+        :param background_manager: BackgroundManager providing the cached background layers.
+        """
+        self.background_manager = background_manager
+        self.last_rects = []  # Screen areas drawn over during the previous frame
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw and present the whole screen on the next frame (e.g. after another screen was shown)."""
+        self.full_redraw = True
+
+    def begin_frame(self, screen):
+        """
+        Erases last frame's sprites and redraws the background where needed.
+        Returns the list of screen areas that changed.
+        :param screen: Pygame screen surface.
+        """
+        if self.full_redraw:
+            return self.background_manager.draw(screen)
+
+        for rect in self.last_rects:
+            self.background_manager.restore(screen, rect)
+        return self.last_rects + [self.background_manager.draw_clouds(screen)]
+
+    def present(self, background_rects, sprite_rects):
+        """
+        Sends the changed screen areas to the display.
+        :param background_rects: Screen areas returned by begin_frame.
+        :param sprite_rects: Screen areas the sprites were drawn to this frame.
+        """
+        if self.full_redraw:
+            target.present()
+            self.full_redraw = False
+        else:
+            target.present(background_rects + sprite_rects)
+        self.last_rects = sprite_rects
@@ -0,0 +1,239 @@
+# Description: This file records the input of a game session and replays it, headless or on screen,
+# with fast-forward and seeking.
+# Run from the repository root with: python replay.py replays/session-20240101-120000.replay --speed 10
+import argparse
+import random
+import struct
+import sys
+import time
+import zlib
+
+import pygame
+from background import BackgroundManager
+from display import target
+from hud import HUD
+from renderer import Renderer
+from settings import (SCREEN_WIDTH, FPS, GAME_TIME, TICK_RATE, REPLAY_SNAPSHOT_INTERVAL,
+                      REPLAY_MAX_SPEED)
+from timestep import FixedTimestep
+from world import World
+
+# Recording layout (little-endian):
+#   header: magic, version, seed, number of platforms, number of ticks, final score (-1 if unknown)
+#   zlib-compressed action bitmasks, one byte per tick
+RECORDING_MAGIC = b"PPRC"
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct("<4sHqIIi")
+
+
+class Recording:
+    """
+    Everything needed to play a game session again: the level seed and the actions held on every tick.
+    """
+    def __init__(self, seed, num_platforms=20, actions=b"", score=None):
+        """
+        :param seed: Seed the level was generated from.
+        :param num_platforms: Number of platforms in the level.
+        :param actions: Action bitmasks (see actions.py) recorded so far, one byte per tick.
+        :param score: Final score of the session, used to check a replay (None if unknown).
+        """
+        self.seed = seed
+        self.num_platforms = num_platforms
+        self.actions = bytearray(actions)
+        self.score = score
+
+    def __len__(self):
+        return len(self.actions)
+
+    def record(self, actions):
+        """
+        Appends the actions held on the next tick.
+        :param actions: Bitmask of the actions held.
+        """
+        self.actions.append(actions)
+
+
+def write_recording(path, recording):
+    """
+    Writes a recording to a file.
+    :param path: File to write to.
+    :param recording: Recording to store.
+    """
+    header = RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, recording.seed, recording.num_platforms,
+                                   len(recording), -1 if recording.score is None else recording.score)
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(zlib.compress(bytes(recording.actions), 9))
+
+
+def read_recording(path):
+    """
+    Reads a recording written by write_recording.
+    :param path: Recording file.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, version, seed, num_platforms, ticks, score = RECORDING_HEADER.unpack_from(data)
+    if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+        raise ValueError(f"{path} is not a version {RECORDING_VERSION} recording")
+    actions = zlib.decompress(data[RECORDING_HEADER.size:])
+    if len(actions) != ticks:
+        raise ValueError(f"{path} is truncated: expected {ticks} ticks, found {len(actions)}")
+    return Recording(seed, num_platforms, actions, None if score < 0 else score)
+
+
+class Replay:
+    """
+    Plays a Recording back in a World, one tick at a time.
+        - The world is generated from the recorded seed and fed the recorded actions, so it goes
+          through exactly the same states as the original session.
+        - Every snapshot_interval ticks the world state is snapshotted, so seek() only has to
+          simulate forward from the nearest snapshot.
+    """
+    def __init__(self, recording, snapshot_interval=REPLAY_SNAPSHOT_INTERVAL):
+        """
+        Generates the recorded level.
+        :param recording: Recording to play.
+        :param snapshot_interval: Ticks between snapshots.
+        """
+        self.recording = recording
+        self.snapshot_interval = snapshot_interval
+        self.world = World(recording.seed, recording.num_platforms)
+        self.snapshots = {0: self.world.snapshot()}  # Tick -> snapshot
+
+    @property
+    def tick(self):
+        return self.world.tick
+
+    @property
+    def finished(self):
+        """Whether every recorded tick has been played."""
+        return self.world.tick >= len(self.recording)
+
+    def step(self):
+        """Plays the next recorded tick."""
+        world = self.world
+        world.step(self.recording.actions[world.tick])
+        if world.tick % self.snapshot_interval == 0 and world.tick not in self.snapshots:
+            self.snapshots[world.tick] = world.snapshot()
+
+    def run(self, ticks=None):
+        """
+        Plays recorded ticks as fast as possible, without drawing.
+        :param ticks: Number of ticks to play (defaults to the rest of the recording).
+        """
+        end = len(self.recording) if ticks is None else min(len(self.recording), self.world.tick + ticks)
+        while self.world.tick < end:
+            self.step()
+
+    def seek(self, tick):
+        """
+        Moves the replay to the given tick, restoring the nearest earlier snapshot if that is faster
+        than playing on from the current tick.
+        :param tick: Tick to move to (clamped to the recording).
+        """
+        tick = max(0, min(tick, len(self.recording)))
+        start = max(snapshot_tick for snapshot_tick in self.snapshots if snapshot_tick <= tick)
+        if not start <= self.world.tick <= tick:
+            self.world.restore(self.snapshots[start])
+        self.run(tick - self.world.tick)
+
+    def verify(self):
+        """
+        Plays the recording to the end and checks that it reaches the recorded score.
+        Returns True if it does (or if the recording has no score).
+        """
+        self.run()
+        return self.recording.score is None or self.world.player.score == self.recording.score
+
+
+def replay_background(recording, tick):
+    """
+    Returns the background the game had at a tick of a recording. The clouds aren't part of the world
+    snapshots, so they are scrolled from the start again with the recording's seed.
+    :param recording: Recording being replayed.
+    :param tick: Tick the replay is at.
+    """
+    background_manager = BackgroundManager(random.Random(recording.seed))
+    background_manager.update_clouds(tick)
+    return background_manager
+
+
+def play(screen, replay, speed=1, start_tick=0):
+    """
+    Shows a replay on screen.
+        - Left/Right arrow: seek 5 seconds back/forward.
+        - Up/Down arrow: double/halve the speed (up to REPLAY_MAX_SPEED).
+        - Space: pause.
+    :param screen: Pygame screen surface.
+    :param replay: Replay to show.
+    :param speed: Playback speed as a multiple of real time.
+    :param start_tick: Tick to start from.
+    """
+    hud = HUD(SCREEN_WIDTH)
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep(TICK_RATE * speed)
+    paused = False
+    replay.seek(start_tick)
+    background_manager = replay_background(replay.recording, replay.tick)
+    renderer = Renderer(background_manager)
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+            if target.handle(event):
+                renderer.invalidate()
+            if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    direction = 1 if event.key == pygame.K_RIGHT else -1
+                    replay.seek(replay.tick + direction * 5 * TICK_RATE)
+                    background_manager = replay_background(replay.recording, replay.tick)
+                    renderer = Renderer(background_manager)  # Draws the first frame in full
+                elif event.key in (pygame.K_UP, pygame.K_DOWN):
+                    speed = min(REPLAY_MAX_SPEED, speed * 2) if event.key == pygame.K_UP else max(1, speed // 2)
+                    timestep = FixedTimestep(TICK_RATE * speed)
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+
+        frame_time = clock.tick(FPS) / 1000
+        if not paused:
+            for _ in range(timestep.advance(frame_time)):
+                if replay.finished:
+                    break
+                replay.step()
+                background_manager.update_clouds()
+
+        background_rects = renderer.begin_frame(screen)
+        sprite_rects = replay.world.draw(screen, timestep.alpha)
+        sprite_rects += hud.draw(screen, replay.world.player.score, GAME_TIME - replay.world.time)
+        renderer.present(background_rects, sprite_rects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game session.")
+    parser.add_argument("recording", help="recording file to replay")
+    parser.add_argument("--headless", action="store_true", help="replay without a display, as fast as possible")
+    parser.add_argument("--speed", type=int, default=1, help=f"playback speed (1-{REPLAY_MAX_SPEED})")
+    parser.add_argument("--seek", type=float, default=0, help="second to start playing from")
+    args = parser.parse_args()
+
+    recording = read_recording(args.recording)
+    replay = Replay(recording)
+    if args.headless:
+        start = time.perf_counter()
+        matches = replay.verify()
+        elapsed = time.perf_counter() - start
+        print(f"Replayed {len(recording)} ticks of seed {recording.seed} in {elapsed:.3f} s: "
+              f"score {replay.world.player.score}" + ("" if matches else f", expected {recording.score}"))
+        sys.exit(0 if matches else 1)
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = target.open("Peaceful Platformer - Replay")
+    play(screen, replay, max(1, min(args.speed, REPLAY_MAX_SPEED)), int(args.seek * TICK_RATE))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,106 @@
 # Description: This file contains the logic for different screens (start, game over)
 import pygame
-import sys
+from assets import load_image
+from display import scaled, scaled_size, target
+from hud import render_text
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, BACKGROUND
 
+BUTTON_RELEASED = pygame.USEREVENT + 1  # Posted once the start button has been shown pressed for long enough
+
 class StartScreen:
+    """
+    Start screen with a button that starts the game.
+    Like every menu it is idle: the main loop waits for events instead of drawing frames,
+    and the screen is only redrawn when something on it changed.
+    Menus are laid out in screen pixels and drawn at the render target's scale (see display.py).
+    """
+    idle = True
+
     def __init__(self):
         """Initialize the start screen with assets and layout."""
-        # Load and scale button assets
-        self.button_img = pygame.image.load("assets/images/button.png")
-        self.button_down_img = pygame.image.load("assets/images/buttondown.png")
-        self.button_img = pygame.transform.scale(self.button_img, (400, 400))
-        self.button_down_img = pygame.transform.scale(self.button_down_img, (400, 400))
-
-    def display(self, screen):
-        """Displays the start screen with a clickable button."""
-        button_rect = self.button_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if button_rect.collidepoint(event.pos):
-                        # Flash the button briefly
-                        screen.blit(self.button_down_img, button_rect)
-                        pygame.display.flip()
-                        pygame.time.delay(200)  # 200ms delay for effect
-                        return # Exit start screen
-
-            # Draw the start screen
-            screen.fill(BACKGROUND)
-            screen.blit(self.button_img, button_rect)
-            pygame.display.flip()
+        # Load and scale the button (the pressed button is only loaded when clicked, see PRELOAD_IMAGES)
+        self.button_img = load_image("images/button.png", scaled_size((400, 400)))
+        self.button_rect = self.button_img.get_rect(center=scaled_size((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
+        self.pressed = False
+        self.dirty = True  # Whether the screen needs to be redrawn
+
+    def enter(self):
+        """Shows the start screen again."""
+        self.pressed = False
+        self.dirty = True
+
+    def handle(self, event):
+        """
+        Handles one event. Returns "game" once the button was clicked, or None to stay.
+        :param event: Pygame event.
+        """
+        if (event.type == pygame.MOUSEBUTTONDOWN and not self.pressed
+                and self.button_rect.collidepoint(target.to_target(event.pos))):
+            # Flash the button briefly; a timer event ends the flash, so nothing blocks meanwhile
+            self.pressed = True
+            self.dirty = True
+            pygame.time.set_timer(BUTTON_RELEASED, 200, loops=1)  # 200ms for effect
+        elif event.type == BUTTON_RELEASED and self.pressed:
+            return "game"
+        elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.VIDEORESIZE):
+            self.dirty = True  # Window was uncovered, restored or resized
+        return None
+
+    def update(self, frame_time):
+        return None
+
+    def draw(self, screen):
+        """Draws the start screen if something changed."""
+        if not self.dirty:
+            return
+        image = load_image("images/buttondown.png", scaled_size((400, 400))) if self.pressed else self.button_img
+        screen.fill(BACKGROUND)
+        screen.blit(image, self.button_rect)
+        target.present()
+        self.dirty = False
 
 class GameOverScreen:
+    """
+    Game over screen showing the score and a restart button. Idle like the start screen.
+    """
+    idle = True
+
     def __init__(self):
-        self.font = pygame.font.Font(None, 72)  # Use a Pygame font
-        self.button_img = pygame.image.load("assets/images/restart.png")
-        self.button_img = pygame.transform.scale(self.button_img, (600, 300))
-
-    def display(self, screen, score):
-        button_rect = self.button_img.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
-        score_text = self.font.render(f"Your Score: {score}", True, (255, 255, 255))  # White text
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if button_rect.collidepoint(event.pos):
-                        return True # Restart the game or exit
-
-            screen.fill(BACKGROUND)
-            screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 3))
-            screen.blit(self.button_img, button_rect)
-            pygame.display.flip()
+        self.score_text = None
+        self.button_rect = None
+        self.dirty = True
+
+    def enter(self, score):
+        """
+        Shows the game over screen for a finished game.
+        :param score: Player's final score.
+        """
+        self.button_img = load_image("images/restart.png", scaled_size((600, 300)))  # Cached, and preloaded at startup
+        self.button_rect = self.button_img.get_rect(center=scaled_size((SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100)))
+        self.score_text = render_text(f"Your Score: {score}", scaled(72))  # White text
+        self.dirty = True
+
+    def handle(self, event):
+        """
+        Handles one event. Returns "start" when the restart button is clicked, or None to stay.
+        :param event: Pygame event.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and self.button_rect.collidepoint(target.to_target(event.pos)):
+            return "start"  # Back to the start screen, which starts the next game
+        if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.VIDEORESIZE):
+            self.dirty = True
+        return None
+
+    def update(self, frame_time):
+        return None
+
+    def draw(self, screen):
+        """Draws the game over screen if something changed."""
+        if not self.dirty:
+            return
+        screen.fill(BACKGROUND)
+        screen.blit(self.score_text, (screen.get_width() // 2 - self.score_text.get_width() // 2,
+                                      scaled(SCREEN_HEIGHT // 3)))
+        screen.blit(self.button_img, self.button_rect)
+        target.present()
+        self.dirty = False
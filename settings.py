@@ -6,6 +6,14 @@ SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 GROUND_LEVEL = 500
 FPS = 60
+TICK_RATE = 60 # Simulation ticks per second (physics constants below are per tick)
+MAX_FRAME_TIME = 0.25 # Longest frame (seconds) the simulation catches up on
+
+# Resolution (see display.py). The game logic always works in SCREEN_WIDTH x SCREEN_HEIGHT pixels.
+RENDER_SCALE = 1.0 # Size of the internal render target relative to the screen size (e.g. 0.5 on weak devices)
+WINDOW_SIZE = None # Window size to upscale the render target to, e.g. (3840, 2160); None to show it unscaled
+SMOOTH_SCALING = False # Filter when upscaling in software (sharper pixels without it)
+HARDWARE_SCALING = False # Let SDL scale the render target on the GPU to a resizable window (WINDOW_SIZE is ignored)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -20,9 +28,76 @@ PLAYER_JUMP_POWER = 17
 PLAYER_JUMP_FORWARD_SPEED = 10
 PLAYER_CLIMB_SPEED = 5
 GRAVITY = 0.75
+JUMP_ANIMATION_TICKS = 12 # 200ms at 60 ticks per second
+
+# Enemy settings
+ENEMY_POOL_CAPACITY = 256 # Most enemies alive at once; the enemy arrays and views are allocated up front
 
 # Level settings
 GAME_TIME = 30000 # 30 seconds = 30000 ms
+GAME_TICKS = GAME_TIME * TICK_RATE // 1000 # Length of a game in simulation ticks
+CHUNK_WIDTH = 2000 # Width of one chunk of an endless level (see streaming.py)
+CHUNK_CHESTS = 2 # Chests placed in each chunk
+CHUNKS_AHEAD = 2 # Chunks generated ahead of the screen on the background thread
+CHUNKS_BEHIND = 1 # Chunks kept loaded behind the screen before they are dropped
+CHUNKS_REMEMBERED = 32 # Chunks either side of the screen whose tails and opened chests are kept (see streaming.py)
+
+# HUD settings
+HUD_FONT_SIZE = 36
+HUD_COLOR = WHITE
+TEXT_CACHE_SIZE = 64 # Maximum number of cached text surfaces
+
+# Recording and replay
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), 'replays') # Directory every game session is recorded to (None to disable)
+REPLAY_SNAPSHOT_INTERVAL = 300 # Ticks between the snapshots used for seeking (5 seconds)
+REPLAY_MAX_SPEED = 100 # Fastest rendered replay speed, as a multiple of real time
+
+# Session telemetry (see telemetry.py)
+TELEMETRY_FILE = os.path.join(os.path.dirname(__file__), 'telemetry', 'sessions.jsonl') # One JSON line per session (None to disable)
+TELEMETRY_BUFFER_SIZE = 256 # Most records waiting to be written; more are dropped
+TELEMETRY_BATCH_SIZE = 32 # Records written per batch at most
+TELEMETRY_FLUSH_INTERVAL = 2.0 # Longest time in seconds a record waits before it is written
+
+# Agent environment (see env.py)
+ENV_VIEW = SCREEN_WIDTH # How far left and right of the player objects are observed, in pixels
+ENV_PLATFORMS = 8 # Nearest platforms in an observation
+ENV_LADDERS = 4 # Nearest ladders in an observation
+ENV_CHESTS = 4 # Nearest chests in an observation
+ENV_ENEMIES = 8 # Nearest enemies in an observation
+
+# Platforms
+PLATFORM_TEXTURE = None # Image tiled over every platform (e.g. 'images/dirt.png'), None for plain yellow
+PLATFORM_CACHE_SIZE = 256 # Maximum number of pre-rendered platform surfaces
+
+# Navigation
+NAV_CACHE_SIZE = 1024 # Levels whose navigation graph is kept by levels.level_graph()
+
+# Profiling and logging
+PROFILE_WINDOW = 300 # Recent frames used for the frame time percentiles (5 seconds at 60 FPS)
+PROFILE_TRACE_FRAMES = 36000 # Most frames kept in a session trace (10 minutes at 60 FPS)
+PROFILE_TRACE_DIR = None # Directory to write a CSV trace of every game session to (None to disable)
+LOG_LEVEL = "INFO"
 
 # Assets path
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), 'assets')
+ASSET_CACHE_SIZE = 64 # Maximum number of cached surfaces (original and scaled)
+# Images (and sizes) loaded in the background while the start screen is shown; keep in sync with the load_image calls
+PRELOAD_IMAGES = [
+    ("images/buttondown.png", (400, 400)),
+    ("images/restart.png", (600, 300)),
+]
+# Sprites (and sizes) packed into the texture atlas; keep in sync with the sprite_atlas() calls
+ATLAS_SPRITES = [
+    ("images/fairy.png", (100, 100)),
+    ("images/fairy_jump.png", (100, 100)),
+    ("images/dirt.png", (200, 100)),
+    ("images/cloud.png", (200, 100)),
+    ("images/chest.png", (75, 75)),
+    ("images/chest_open.png", (75, 75)),
+    ("images/enemy.png", (50, 50)),
+    ("images/ladder.png", (40, 100)),
+]
+ATLAS_WIDTH = 512 # Width of the atlas surface
+ATLAS_PADDING = 1 # Empty pixels around every sprite in the atlas
+ATLAS_IMAGE = os.path.join(ASSETS_PATH, 'atlas.png') # Built by running atlas.py
+ATLAS_TABLE = os.path.join(ASSETS_PATH, 'atlas.json') # Region table of the built atlas
@@ -0,0 +1,68 @@
+# Description: This file contains the headless simulation used for automated playthroughs.
+from itertools import islice
+
+from actions import NONE
+from settings import GAME_TICKS
+from world import World
+
+
+class SimulationResult:
+    """
+    Final score and state of a finished simulation.
+    """
+    def __init__(self, world):
+        """
+        Copies the interesting parts of the world's final state.
+        :param world: World at the end of the simulation.
+        """
+        self.seed = world.seed
+        self.ticks = world.tick
+        self.score = world.player.score
+        self.chests_opened = sum(chest.collected for chest in world.chest_manager.chests)
+        self.player_pos = world.player.rect.topleft
+        self.camera_x = world.camera.x
+        self.world = world  # Full final state, for anything not copied above
+
+    def __repr__(self):
+        return f"SimulationResult(seed={self.seed}, ticks={self.ticks}, score={self.score})"
+
+
+class Simulation:
+    """
+    Runs one game without a display, event queue or wall clock:
+        - The level is generated from the seed, so the same seed and actions give the same result.
+        - Input comes from a stream of action bitmasks (see actions.py), one per tick.
+        - Time is the world's tick counter; a game lasts GAME_TICKS ticks.
+    """
+    def __init__(self, seed, num_platforms=20, ticks=GAME_TICKS):
+        """
+        Generates the level for the simulation.
+        :param seed: Seed for level generation.
+        :param num_platforms: Number of platforms in the level.
+        :param ticks: Number of ticks the game lasts.
+        """
+        self.world = World(seed, num_platforms)
+        self.ticks = ticks
+
+    def run(self, actions=()):
+        """
+        Plays the game to the end and returns a SimulationResult.
+        Once the action stream runs out, the remaining ticks are played with no input.
+        :param actions: Iterable of action bitmasks, one per tick.
+        """
+        world = self.world
+        remaining = self.ticks - world.tick
+        for held in islice(actions, remaining):
+            world.step(held)
+        world.run(self.ticks - world.tick, NONE)
+        return SimulationResult(world)
+
+
+def simulate(seed, actions=(), num_platforms=20):
+    """
+    Shortcut for Simulation(seed, num_platforms).run(actions).
+    :param seed: Seed for level generation.
+    :param actions: Iterable of action bitmasks, one per tick.
+    :param num_platforms: Number of platforms in the level.
+    """
+    return Simulation(seed, num_platforms).run(actions)
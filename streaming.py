@@ -0,0 +1,206 @@
+# Description: This file contains the endless level, generated in chunks as the camera approaches and dropped
+# once it is far behind.
+import math
+import random
+import threading
+
+import pygame
+from objects.chest import Chest
+from objects.ladder import Ladder
+from objects.managers import first_platform_rect, next_platform_rect, ladder_rects, chest_rect
+from objects.platform import Platform
+from settings import SCREEN_HEIGHT, GROUND_LEVEL, CHUNK_WIDTH, CHUNK_CHESTS, CHUNKS_AHEAD, CHUNKS_BEHIND, \
+    CHUNKS_REMEMBERED
+
+
+class Chunk:
+    """
+    Layout of one chunk as plain rects. Building one creates no images, so it is safe on a background thread.
+    """
+    def __init__(self, index, platforms, ladders, chests, tail):
+        """
+        :param index: Chunk number; chunk i holds the platforms starting in [i * CHUNK_WIDTH, (i + 1) * CHUNK_WIDTH).
+        :param platforms: List of platform rects.
+        :param ladders: List of ladder rects.
+        :param chests: List of chest rects.
+        :param tail: (last platform rect, whether it had a ladder), which the next chunk continues from.
+        """
+        self.index = index
+        self.platforms = platforms
+        self.ladders = ladders
+        self.chests = chests
+        self.tail = tail
+
+
+def generate_chunk(seed, index, tail):
+    """
+    Generates one chunk of the endless level from its own seed, continuing from the previous chunk
+    so the spacing rules on PlatformManager and LadderManager hold across chunk borders.
+    :param seed: Seed of the level.
+    :param index: Chunk number.
+    :param tail: Tail of the previous chunk, or None for the first chunk.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    end = (index + 1) * CHUNK_WIDTH
+
+    platforms = []
+    if tail is None:
+        platforms.append(pygame.Rect(first_platform_rect(SCREEN_HEIGHT, rng)))
+        last, last_had_ladder = platforms[0], False
+    else:
+        last, last_had_ladder = tail
+    while True:
+        rect = pygame.Rect(next_platform_rect(last, SCREEN_HEIGHT, rng))
+        if rect.x >= end:
+            break  # Starts in the next chunk, which generates its own
+        platforms.append(rect)
+        last = rect
+
+    ladders, last_had_ladder = ladder_rects(platforms, GROUND_LEVEL, last_had_ladder)
+    eligible_platforms = [rect for rect in platforms if rect.bottom > 160]
+    chests = [chest_rect(rect) for rect in rng.sample(eligible_platforms, min(CHUNK_CHESTS, len(eligible_platforms)))]
+    return Chunk(index, platforms, [pygame.Rect(rect) for rect in ladders], [pygame.Rect(rect) for rect in chests],
+                 (last, last_had_ladder))
+
+
+class ChunkedLevel:
+    """
+    Endless level that keeps the world's managers filled with the chunks around the camera.
+        - Chunks are generated in order, each from its own seed and the tail of the previous chunk,
+          so the same seed always gives the same level.
+        - A background thread can generate the next CHUNKS_AHEAD chunks before they are needed.
+        - Chunks more than CHUNKS_BEHIND behind the camera are dropped; if the player walks back,
+          they are rebuilt from the tail stored for the chunk before them.
+        - Tails and opened chests are only kept for chunks within CHUNKS_REMEMBERED of the screen, so memory
+          stays bounded however far the player goes. A missing tail is rebuilt by generating the chunks
+          from the nearest stored tail (or the start of the level) again; chests forgotten this way are closed again.
+    """
+    def __init__(self, seed=None, background=True):
+        """
+        :param seed: Seed of the level (a random one is picked if None).
+        :param background: Generate upcoming chunks on a background thread.
+        """
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.level_width = math.inf
+        self.margin = CHUNK_WIDTH // 2  # How far beyond the screen edges chunks are loaded
+        self.chunks = {}  # Chunk number -> Chunk, for chunks generated and not dropped
+        self.tails = {}  # Chunk number -> tail, for chunks within CHUNKS_REMEMBERED of the screen
+        self.frontier = -1  # Highest chunk number generated so far
+        self.loaded = {}  # Chunk number -> (platforms, ladders, chests) objects in the managers
+        self.opened_chests = set()  # (chunk number, chest number) of chests opened within CHUNKS_REMEMBERED
+
+        self.lock = threading.Condition()
+        self.wanted = CHUNKS_AHEAD  # Highest chunk the background thread should generate
+        self.closed = False
+        self.thread = None
+        if background:
+            self.thread = threading.Thread(target=self.prefetch, daemon=True)
+            self.thread.start()
+
+    def close(self):
+        """Stops the background thread."""
+        with self.lock:
+            self.closed = True
+            self.lock.notify()
+
+    def prefetch(self):
+        """Background thread: generates chunks up to wanted, one at a time."""
+        while True:
+            with self.lock:
+                while not self.closed and self.frontier >= self.wanted:
+                    self.lock.wait()
+                if self.closed:
+                    return
+                index = self.frontier + 1
+                tail = self.tails.get(index - 1)
+            chunk = generate_chunk(self.seed, index, tail)  # Outside the lock, so the game loop never waits
+            with self.lock:
+                if self.frontier < index:
+                    self.store(chunk)
+
+    def store(self, chunk):
+        """Records a newly generated chunk. Call with the lock held."""
+        self.chunks[chunk.index] = chunk
+        self.tails[chunk.index] = chunk.tail
+        self.frontier = max(self.frontier, chunk.index)
+
+    def chunk(self, index):
+        """
+        Returns chunk index, generating it (and any chunks before it) if the background thread hasn't yet.
+        :param index: Chunk number.
+        """
+        with self.lock:
+            if index not in self.chunks:
+                # Continue the level, or rebuild a dropped chunk from the nearest tail before it
+                start = index
+                while start > 0 and start - 1 not in self.tails:
+                    start -= 1
+                for next_index in range(start, index):
+                    self.tails[next_index] = generate_chunk(self.seed, next_index, self.tails.get(next_index - 1)).tail
+                self.store(generate_chunk(self.seed, index, self.tails.get(index - 1)))
+            return self.chunks[index]
+
+    def update(self, world):
+        """
+        Loads the chunks around the camera into the managers and drops the ones far behind.
+        :param world: World whose managers should hold the loaded objects.
+        """
+        camera = world.camera
+        first = max(0, (camera.x - self.margin) // CHUNK_WIDTH)
+        last = (camera.x + camera.width + self.margin) // CHUNK_WIDTH
+
+        loaded = [index for index in range(first, last + 1) if index not in self.loaded]
+        for index in loaded:
+            self.load(world, self.chunk(index))
+        unloaded = [index for index in self.loaded if not first - CHUNKS_BEHIND <= index <= last]
+        for index in unloaded:
+            self.unload(world, index)
+
+        with self.lock:
+            for index in [index for index in self.chunks if index < first - CHUNKS_BEHIND]:
+                del self.chunks[index]
+            if loaded or unloaded:
+                self.forget(first - CHUNKS_REMEMBERED, last + CHUNKS_REMEMBERED)
+            if self.wanted != last + CHUNKS_AHEAD:
+                self.wanted = last + CHUNKS_AHEAD
+                self.lock.notify()
+
+    def forget(self, first, last):
+        """
+        Drops the tails and opened chests of chunks outside first..last, and any chunks generated past last.
+        Call with the lock held.
+        :param first: First chunk number to remember.
+        :param last: Last chunk number to remember.
+        """
+        for index in [index for index in self.tails if not first - 1 <= index <= last]:
+            del self.tails[index]  # The tail before first is kept to rebuild chunk first
+        for index in [index for index in self.chunks if index > last]:
+            del self.chunks[index]
+        self.frontier = min(self.frontier, last)
+        self.opened_chests = {chest for chest in self.opened_chests if first <= chest[0] <= last}
+
+    def load(self, world, chunk):
+        """Creates the objects of a chunk and adds them to the managers."""
+        platforms = [Platform(*rect) for rect in chunk.platforms]
+        ladders = [Ladder(*rect) for rect in chunk.ladders]
+        chests = [Chest(*rect) for rect in chunk.chests]
+        for i, chest in enumerate(chests):
+            chest.collected = (chunk.index, i) in self.opened_chests
+
+        for manager, objects in ((world.platform_manager, platforms), (world.ladder_manager, ladders),
+                                 (world.chest_manager, chests)):
+            for obj in objects:
+                manager.add(obj)
+        self.loaded[chunk.index] = (platforms, ladders, chests)
+
+    def unload(self, world, index):
+        """Removes the objects of a chunk from the managers, remembering which chests were opened."""
+        platforms, ladders, chests = self.loaded.pop(index)
+        for i, chest in enumerate(chests):
+            if chest.collected:
+                self.opened_chests.add((index, i))
+
+        for manager, objects in ((world.platform_manager, platforms), (world.ladder_manager, ladders),
+                                 (world.chest_manager, chests)):
+            for obj in objects:
+                manager.remove(obj)
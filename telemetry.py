@@ -0,0 +1,168 @@
+# Description: This file contains the telemetry writer, which appends one JSON record per game session to a local
+# file from a background thread, so the game loop never waits for the disk.
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from settings import TELEMETRY_BUFFER_SIZE, TELEMETRY_BATCH_SIZE, TELEMETRY_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryWriter:
+    """
+    Appends records to a JSON-lines file.
+        - record() puts a record in a bounded in-memory buffer and returns straight away.
+        - A background thread takes the records out in batches and writes each batch with one write() call,
+          once a batch is full or flush_interval seconds after the first record of it arrived.
+        - Backpressure: when the buffer is full, record() either drops the record (counted in stats())
+          or, with block=True, waits for the writer to make room.
+        - close() writes everything still buffered and stops the thread; call it before quitting.
+    """
+    def __init__(self, path, capacity=TELEMETRY_BUFFER_SIZE, batch_size=TELEMETRY_BATCH_SIZE,
+                 flush_interval=TELEMETRY_FLUSH_INTERVAL):
+        """
+        Starts the writer thread. The file is created on the first write.
+        :param path: JSON-lines file to append to.
+        :param capacity: Most records buffered at once.
+        :param batch_size: Records written per write() call at most.
+        :param flush_interval: Longest time in seconds a record waits in the buffer.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = deque()  # (time queued, record)
+        self.lock = threading.Condition()
+        self.closed = False
+        self.pending = 0  # Records taken from the buffer and not written yet
+        self.flushing = False  # Write everything buffered without waiting for full batches
+
+        # Metrics
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed = 0  # Records lost because they could not be serialized or written
+
+        self.thread = threading.Thread(target=self.run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    def record(self, record, block=False, timeout=None):
+        """
+        Queues a record for writing. Returns True if it was queued, False if it was dropped.
+        :param record: JSON-serializable dict. It is serialized on the writer thread, so don't change it afterwards.
+        :param block: Wait for room if the buffer is full instead of dropping the record.
+        :param timeout: Longest time in seconds to wait for room (None waits as long as needed).
+        """
+        with self.lock:
+            if self.closed:
+                raise ValueError("Telemetry writer is closed")
+            if len(self.buffer) >= self.capacity:
+                if not block or not self.lock.wait_for(lambda: len(self.buffer) < self.capacity, timeout):
+                    self.dropped += 1
+                    if self.dropped & (self.dropped - 1) == 0:  # Log the 1st, 2nd, 4th, 8th... drop, not every one
+                        logger.warning("Telemetry buffer full, record dropped (%d so far)", self.dropped)
+                    return False
+            self.buffer.append((time.monotonic(), record))
+            self.recorded += 1
+            self.lock.notify_all()
+            return True
+
+    def run(self):
+        """Writer thread: writes batches until closed and the buffer is empty."""
+        while True:
+            with self.lock:
+                while not self.closed and not self.batch_ready():
+                    timeout = None
+                    if self.buffer:
+                        timeout = max(0.0, self.buffer[0][0] + self.flush_interval - time.monotonic())
+                    self.lock.wait(timeout)
+                if not self.buffer:
+                    return  # Closed and nothing left to write
+                batch = [self.buffer.popleft()[1] for _ in range(min(self.batch_size, len(self.buffer)))]
+                self.pending = len(batch)
+                self.flushing = self.flushing and bool(self.buffer)
+                self.lock.notify_all()  # Room for blocked record() calls
+
+            self.write(batch)  # Outside the lock, so record() never waits for the disk
+            with self.lock:
+                self.pending = 0
+                self.lock.notify_all()  # For flush()
+
+    def batch_ready(self):
+        """Whether a batch should be written now. Call with the lock held."""
+        if not self.buffer:
+            return False
+        return (self.flushing or len(self.buffer) >= self.batch_size
+                or time.monotonic() - self.buffer[0][0] >= self.flush_interval)
+
+    def write(self, batch):
+        """Appends a batch of records to the file, skipping the records that can't be serialized."""
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+            except (TypeError, ValueError):
+                self.failed += 1
+                logger.exception("Could not serialize telemetry record %r", record)
+        if not lines:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as file:
+                file.write("".join(lines))
+            self.written += len(lines)
+            self.batches += 1
+        except OSError:
+            self.failed += len(lines)
+            logger.exception("Could not write %d telemetry records to %s", len(lines), self.path)
+
+    def flush(self, timeout=None):
+        """
+        Writes everything buffered now and waits until it is on disk. Returns False if timeout ran out first.
+        :param timeout: Longest time in seconds to wait (None waits as long as needed).
+        """
+        with self.lock:
+            if self.buffer:
+                self.flushing = True
+                self.lock.notify_all()
+            return self.lock.wait_for(lambda: not self.buffer and not self.pending, timeout)
+
+    def close(self, timeout=None):
+        """
+        Writes everything still buffered and stops the writer thread.
+        :param timeout: Longest time in seconds to wait for the last writes (None waits as long as needed).
+        """
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        self.thread.join(timeout)
+
+    def stats(self):
+        """Returns the record counters and the number of records buffered."""
+        with self.lock:
+            return {
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "buffered": len(self.buffer) + self.pending,
+            }
+
+
+def read_records(path):
+    """
+    Yields the records of a telemetry file.
+    :param path: JSON-lines file written by a TelemetryWriter.
+    """
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,106 @@
+# Description: Checks the navigation graph (and so the level validator) against a simulated player.
+# Run from the repository root with: python -m pytest tests
+import functools
+import random
+
+import pytest
+
+from actions import LEFT, RIGHT, JUMP, UP, NONE
+from levels import create_managers, generate_level, level_graph
+from navigation import GROUND
+from objects.managers import EnemyManager
+from player import Player
+from settings import GROUND_LEVEL
+
+START_SPACING = 20  # Pixels between the take-off points tried on each surface
+HOLD_TICKS = (0, 4, 8, 12, 20, 40)  # How long the direction key is held after taking off
+MAX_TICKS = 150  # Longest move simulated
+
+
+def simulate_move(player, managers, x, surface_y, actions, hold):
+    """
+    Plays one move with Player.update and returns the node the player ends up standing on.
+    UP is held all along, so the player climbs every ladder they touch.
+    :param player: Player to move (reset first).
+    :param managers: (platform, ladder, chest, enemy) managers of the level.
+    :param x: Take-off x-coordinate of the player's midpoint.
+    :param surface_y: Y-coordinate of the take-off surface.
+    :param actions: Direction and jump actions held on the first tick.
+    :param hold: Number of ticks the direction is held.
+    """
+    player.__init__()
+    player.rect.midbottom = (x, surface_y)
+    player.on_platform = True
+    direction = actions & (LEFT | RIGHT)
+    for tick in range(MAX_TICKS):
+        held = UP | (direction if tick < hold else NONE) | (actions & JUMP if tick == 0 else NONE)
+        player.update(held, *managers)
+        if tick > 0 and player.on_platform and player.vel_y == 0 and not player.on_ladder:
+            break
+    if player.rect.bottom == GROUND_LEVEL:
+        return GROUND
+    for i, platform in enumerate(managers[0].platforms):
+        if platform.rect.top == player.rect.bottom and platform.rect.left <= player.rect.centerx <= platform.rect.right:
+            return i
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def simulated_reachable(seed):
+    """Returns the platforms a simulated player gets onto from the ground in the level of a seed (cached)."""
+    platform_manager, ladder_manager, chest_manager = create_managers(random.Random(seed))
+    managers = (platform_manager, ladder_manager, chest_manager, EnemyManager())
+    player = Player()
+    surfaces = {GROUND: (0, platform_manager.level_width, GROUND_LEVEL)}
+    surfaces.update((i, (platform.rect.left, platform.rect.right, platform.rect.top))
+                    for i, platform in enumerate(platform_manager.platforms))
+
+    reached, frontier = {GROUND}, [GROUND]
+    while frontier:
+        left, right, surface_y = surfaces[frontier.pop()]
+        for x in range(left, right + 1, START_SPACING):
+            for direction in (LEFT, RIGHT, NONE):
+                for jump in (JUMP, NONE):
+                    for hold in HOLD_TICKS:
+                        node = simulate_move(player, managers, x, surface_y, direction | jump, hold)
+                        if node is not None and node not in reached:
+                            reached.add(node)
+                            frontier.append(node)
+    return reached - {GROUND}
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_validator_accepts_every_platform_the_player_reaches(seed):
+    level = generate_level(seed)
+    reached = simulated_reachable(seed)
+    assert reached <= level.nav_graph().reachable
+    if all(level.nav_graph().chest_platform(chest) in reached for chest in level.chests):
+        assert level.validate()
+
+
+def test_ladder_grabbed_mid_jump():
+    platform_manager, ladder_manager, chest_manager = create_managers(random.Random(0))
+    managers = (platform_manager, ladder_manager, chest_manager, EnemyManager())
+    # The ladder up to platform 17 ends 277 pixels above the ground, out of reach standing
+    assert simulate_move(Player(), managers, 4475, GROUND_LEVEL, RIGHT | JUMP, 30) == 17
+    level = generate_level(0)
+    assert level.nav_graph().path(GROUND, 17) == [GROUND, 17]
+    assert level.validate()
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_cached_graph_answers_chest_queries_like_the_player(seed):
+    graph = level_graph(seed)
+    reached = simulated_reachable(seed)
+    for chest in generate_level(seed).chests:
+        assert graph.can_reach_chest(chest) == (graph.chest_platform(chest) in reached)
+
+
+def test_shortest_paths_climb_ladders():
+    graph = level_graph(1)
+    assert graph is level_graph(1)
+    # Every other platform of seed 1 has a ladder, climbed straight from the ground
+    for i in range(6, 19, 2):
+        assert graph.path(GROUND, i) == [GROUND, i]
+    assert graph.moves(GROUND, 9) == 2
+    assert not graph.can_reach(19)
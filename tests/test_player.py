@@ -0,0 +1,48 @@
+# Description: Checks that fast falls land on thin platforms and that holding Down drops through them.
+# Run from the repository root with: python -m pytest tests
+from actions import DOWN, NONE
+from objects.managers import PlatformManager, LadderManager, ChestManager, EnemyManager
+from objects.platform import Platform
+from player import Player
+from settings import GROUND_LEVEL
+
+PLATFORM_TOP = 300
+PLATFORM_HEIGHT = 20
+FALL_SPEED = 75  # Moves the player about 150 pixels in one tick, far more than the platform is thick
+
+
+def falling_player():
+    """Returns the managers of a level with one thin platform, and a player falling fast just above it."""
+    platform_manager = PlatformManager()
+    platform_manager.add(Platform(400, PLATFORM_TOP, 200, PLATFORM_HEIGHT))
+    platform_manager.level_width = 1000
+    managers = (platform_manager, LadderManager(), ChestManager(), EnemyManager())
+    player = Player()
+    player.rect.midbottom = (500, PLATFORM_TOP - 10)
+    player.vel_y = FALL_SPEED
+    return player, managers
+
+
+def test_fast_fall_lands_on_thin_platform():
+    player, managers = falling_player()
+    start = player.rect.bottom
+    player.update(NONE, *managers)
+    assert player.rect.bottom == PLATFORM_TOP
+    assert player.on_platform and player.vel_y == 0
+    # Without the platform the same tick would have carried the player right past it
+    assert start + 2 * FALL_SPEED > PLATFORM_TOP + PLATFORM_HEIGHT
+
+
+def test_down_drops_through_platform():
+    # Holding Down during a fast fall passes through the platform
+    player, managers = falling_player()
+    player.update(DOWN, *managers)
+    assert player.rect.bottom > PLATFORM_TOP + PLATFORM_HEIGHT
+
+    # Standing on it, pressing Down drops the player through to the ground
+    player, managers = falling_player()
+    player.update(NONE, *managers)
+    player.update(DOWN, *managers)
+    for _ in range(30):
+        player.update(NONE, *managers)
+    assert player.rect.bottom == GROUND_LEVEL
@@ -0,0 +1,37 @@
+# Description: This file contains the fixed-timestep clock that decouples the simulation from rendering.
+from settings import TICK_RATE, MAX_FRAME_TIME
+
+
+class FixedTimestep:
+    """
+    Accumulates real frame time and turns it into a whole number of simulation ticks.
+        - Every tick advances the simulation by exactly 1 / tick_rate seconds.
+        - The leftover time is exposed as alpha, used to interpolate between the last two
+          simulated states when drawing.
+        - Very long frames are capped at max_frame_time so a stall can't queue up an
+          unbounded number of ticks.
+    """
+    def __init__(self, tick_rate=TICK_RATE, max_frame_time=MAX_FRAME_TIME):
+        """
+        Initializes the timestep with an empty accumulator.
+        :param tick_rate: Number of simulation ticks per second.
+        :param max_frame_time: Longest frame (in seconds) that is fully simulated.
+        """
+        self.dt = 1 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """
+        Adds the duration of the last frame and returns how many ticks to simulate.
+        :param frame_time: Real time since the previous frame in seconds.
+        """
+        self.accumulator += min(frame_time, self.max_frame_time)
+        ticks = int(self.accumulator / self.dt)
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far (0-1) the current frame is between the previous and the latest tick."""
+        return self.accumulator / self.dt
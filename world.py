@@ -0,0 +1,164 @@
+# Description: This file contains the game world: the player, level objects and camera advanced one tick at a time.
+import random
+
+import pygame
+from actions import NONE
+from camera import Camera
+from levels import create_managers
+from objects.managers import PlatformManager, LadderManager, ChestManager, EnemyManager
+from player import Player
+from profiler import profiler
+from settings import GROUND_LEVEL, TICK_RATE
+
+
+def copy_state(state):
+    """
+    Returns a copy of an object's attributes (or of such a copy) with the mutable rects copied.
+    Images and other values are shared, they never change while playing.
+    :param state: Object, or dict of attributes.
+    """
+    if not isinstance(state, dict):
+        state = vars(state)
+    return {name: value.copy() if isinstance(value, pygame.Rect) else value for name, value in state.items()}
+
+
+class World:
+    """
+    Holds the simulation state of one game.
+        - step() advances everything by one fixed tick of 1 / TICK_RATE seconds.
+        - Time is counted in ticks, never read from the wall clock, so the world can be
+          stepped as fast as the CPU allows when nothing is drawn.
+    """
+    def __init__(self, seed=None, num_platforms=20, level=None):
+        """
+        Generates a new level (or uses a streamed one) with the player at the start.
+        :param seed: Seed for level generation; the same seed always builds the same level (a random one is picked if None).
+        :param num_platforms: Number of platforms in the level.
+        :param level: Level that loads its objects as the camera moves, used instead of generating one,
+                      e.g. a MappedLevel (see levelfile.py) or a ChunkedLevel (see streaming.py).
+        """
+        self.seed = seed if level is None else level.seed
+        if self.seed is None:
+            self.seed = random.randrange(2 ** 32)  # Pick one, so the game can still be replayed
+        self.rng = random.Random(self.seed)
+
+        # Create player instance
+        self.player = Player()
+
+        # Create platforms, ladders and chests
+        self.level = level
+        if level is None:
+            self.platform_manager, self.ladder_manager, self.chest_manager = create_managers(self.rng, num_platforms)
+        else:
+            # Objects are loaded by the level as the camera approaches them
+            self.platform_manager, self.ladder_manager, self.chest_manager = PlatformManager(), LadderManager(), ChestManager()
+            self.platform_manager.level_width = level.level_width
+
+        # Create the camera (objects stay in world coordinates, the camera scrolls over them)
+        self.camera = Camera(self.platform_manager.level_width)
+
+        # Spawn enemies
+        self.enemy_manager = EnemyManager()
+        self.enemy_manager.generate_enemies(self.camera, GROUND_LEVEL)
+        if self.level:
+            self.level.update(self)
+
+        self.tick = 0  # Number of ticks simulated so far
+
+    @property
+    def time(self):
+        """Simulated time in milliseconds."""
+        return self.tick * 1000 // TICK_RATE
+
+    def step(self, actions=NONE):
+        """
+        Advances the world by one tick.
+        :param actions: Bitmask of the actions held this tick (see actions.py).
+        """
+        self.tick += 1
+        with profiler.scope("player"):
+            self.player.update(actions, self.platform_manager, self.ladder_manager, self.chest_manager,
+                               self.enemy_manager)
+
+        # Scroll the camera to follow the player
+        self.camera.follow(self.player.rect)
+        if self.level:
+            with profiler.scope("level"):
+                self.level.update(self)
+
+        with profiler.scope("enemies"):
+            self.enemy_manager.update(self.time, self.camera, GROUND_LEVEL)
+
+    def snapshot(self):
+        """
+        Returns a copy of everything that changes while playing, for restore() to go back to.
+        Platforms and ladders never change in a generated level, so they are not copied.
+        """
+        if self.level:
+            raise ValueError("Snapshots of streamed levels are not supported")
+        store = self.enemy_manager.store
+        return {
+            "tick": self.tick,
+            "rng": self.rng.getstate(),
+            "player": copy_state(self.player),
+            "camera": copy_state(self.camera),
+            "chests": [chest.collected for chest in self.chest_manager.chests],
+            "enemies": (store.count, list(store.free), store.active, [array.copy() for array in store.arrays()]),
+            "last_spawn_time": self.enemy_manager.last_spawn_time,
+        }
+
+    def restore(self, snapshot):
+        """
+        Puts the world back in the state a snapshot was taken in. The snapshot can be restored again later.
+        :param snapshot: Snapshot returned by snapshot() on this world.
+        """
+        self.tick = snapshot["tick"]
+        self.rng.setstate(snapshot["rng"])
+        vars(self.player).update(copy_state(snapshot["player"]))
+        vars(self.camera).update(copy_state(snapshot["camera"]))
+        for chest, collected in zip(self.chest_manager.chests, snapshot["chests"]):
+            chest.collected = collected
+
+        store = self.enemy_manager.store
+        store.count, free, store.active, arrays = snapshot["enemies"]
+        store.free = list(free)
+        for array, saved in zip(store.arrays(), arrays):
+            array[:] = saved
+        self.enemy_manager.last_spawn_time = snapshot["last_spawn_time"]
+
+    def run(self, ticks, actions=NONE):
+        """
+        Advances the world by several ticks as fast as possible, without drawing.
+        :param ticks: Number of ticks to simulate.
+        :param actions: Bitmask of the actions held for every tick.
+        """
+        for _ in range(ticks):
+            self.step(actions)
+
+    def draw(self, screen, alpha=1.0):
+        """
+        Draws the world, interpolated between the previous and the latest tick.
+        Returns the screen areas drawn to.
+        :param screen: Pygame screen surface.
+        :param alpha: How far (0-1) to interpolate from the previous tick to the latest one.
+        """
+        self.camera.begin_frame(alpha)
+
+        # Draw player
+        with profiler.scope("draw player"):
+            rects = [self.player.draw(screen, self.camera, alpha)]
+
+        # Draw platforms, ladders, and chests
+        with profiler.scope("draw platforms"):
+            rects += self.platform_manager.draw(screen, self.camera)
+        with profiler.scope("draw ladders"):
+            rects += self.ladder_manager.draw(screen, self.camera)
+        with profiler.scope("draw chests"):
+            rects += self.chest_manager.draw(screen, self.camera)
+
+        # Draw enemies
+        with profiler.scope("draw enemies"):
+            rects += self.enemy_manager.draw(screen, self.camera, alpha)
+        profiler.sample("objects drawn", self.camera.drawn)
+        profiler.sample("objects culled", self.camera.culled)
+        return rects